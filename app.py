@@ -10,7 +10,7 @@ from datetime import datetime
 
 # Impor fungsi yang benar dari modul
 from dashboard_component import show_dashboard, add_to_history
-from universal_scraper import scrape_universal_contact, save_scraped_data
+from universal_scraper import scrape_universal_contact, crawl_universal_contact, scrape_universal_batch, save_scraped_data
 
 # Page configuration
 st.set_page_config(page_title="Caprae - Web Contact Scraper", layout="wide", page_icon="🔍")
@@ -42,8 +42,23 @@ def show_contact_section():
 
 # Import fungsi scraper yang menggunakan Playwright
 try:
-    # Simulasi jika modul tidak ada
-    raise ImportError
+    from scraper import scrape_saasquatch as _scrape_saasquatch, scrape_pricing as _scrape_pricing, iter_pricing_pages as _iter_pricing_pages
+    from browser_pool import get_browser_pool
+
+    @st.cache_resource
+    def get_shared_browser_pool():
+        # One browser for every session of this Streamlit server; closed by the pool's atexit hook
+        return get_browser_pool()
+
+    def scrape_saasquatch(url):
+        return _scrape_saasquatch(url, pool=get_shared_browser_pool())
+
+    def scrape_pricing(url):
+        return _scrape_pricing(url, pool=get_shared_browser_pool())
+
+    def iter_pricing_pages(urls, max_concurrency=4, page_timeout=60):
+        return _iter_pricing_pages(urls, pool=get_shared_browser_pool(),
+                                   max_concurrency=max_concurrency, page_timeout=page_timeout)
 except ImportError:
     # Fallback jika modul tidak ada
     def scrape_saasquatch(url):
@@ -58,6 +73,12 @@ except ImportError:
             'error': None
         }
 
+    scrape_pricing = scrape_saasquatch
+
+    def iter_pricing_pages(urls, max_concurrency=4, page_timeout=60):
+        for url in dict.fromkeys(urls):
+            yield url, scrape_saasquatch(url)
+
 # Navigation sidebar
 st.sidebar.title("🔍 Navigation")
 page = st.sidebar.radio("Navigate to", ["Dashboard", "Universal Contact Scraper", "Competitive Analysis", "Contact Us"])
@@ -68,16 +89,16 @@ def scrape_pricing_data(url):
     Scrapes pricing data from the SaaSquatchLeads website.
     Menggunakan kombinasi Requests + Playwright untuk hasil terbaik.
     """
-    # Pertama coba dengan Playwright (lebih powerful untuk JavaScript sites)
-    playwright_result = scrape_saasquatch(url)
+    # Pertama coba fetch statis; Playwright hanya dipakai jika tabel tidak ada di HTML
+    tiered_result = scrape_pricing(url)
     
-    if playwright_result and 'pricing_data' in playwright_result and not playwright_result['pricing_data'].empty:
+    if tiered_result and 'pricing_data' in tiered_result and not tiered_result['pricing_data'].empty:
         return {
-            'pricing_data': playwright_result['pricing_data'],
+            'pricing_data': tiered_result['pricing_data'],
             'error': None
         }
     
-    # Fallback ke Requests + BeautifulSoup jika Playwright gagal
+    # Fallback ke data demo jika kedua cara gagal
     try:
         # Simulasi data untuk demo
         return {
@@ -114,9 +135,24 @@ elif page == "Universal Contact Scraper":
     with button_col:
         scrape_clicked = st.button("🚀 Scrape Now", type="primary", use_container_width=True)
     
+    # Crawl mode: ikuti link /contact, /about, /impressum di situs yang sama
+    crawl_col, depth_col, pages_col = st.columns([2, 1, 1])
+    
+    with crawl_col:
+        crawl_mode = st.checkbox("Crawl contact pages (/contact, /about, /impressum ...)", value=False)
+    
+    with depth_col:
+        crawl_depth = st.number_input("Max depth", min_value=1, max_value=5, value=2, disabled=not crawl_mode)
+    
+    with pages_col:
+        crawl_pages = st.number_input("Max pages", min_value=1, max_value=50, value=10, disabled=not crawl_mode)
+    
     if scrape_clicked and url_input:
         with st.spinner('Extracting contact information...'):
-            result = scrape_universal_contact(url_input)
+            if crawl_mode:
+                result = crawl_universal_contact(url_input, max_depth=crawl_depth, max_pages=crawl_pages)
+            else:
+                result = scrape_universal_contact(url_input)
             
         if result.get('error'):
             st.error(f"Error: {result['error']}")
@@ -130,6 +166,11 @@ elif page == "Universal Contact Scraper":
             # Results horizontal layout
             st.subheader("📋 Scraping Results")
             
+            if result.get('pages_crawled'):
+                with st.expander(f"🔗 Pages crawled ({len(result['pages_crawled'])})"):
+                    for page_url in result['pages_crawled']:
+                        st.write(page_url)
+            
             # Email & Phone side by side
             email_col, phone_col = st.columns(2)
             
@@ -163,6 +204,55 @@ elif page == "Universal Contact Scraper":
     elif scrape_clicked and not url_input:
         st.warning("Please enter a website URL first")
 
+    st.divider()
+
+    # Batch scraping dari file CSV
+    st.subheader("📂 Batch Scrape from CSV")
+    st.write("Upload a CSV with a `url` column (or URLs in the first column) to scrape many websites at once.")
+
+    upload_col, workers_col = st.columns([3, 1])
+
+    with upload_col:
+        csv_file = st.file_uploader("Upload URL list", type=["csv"])
+
+    with workers_col:
+        max_workers = st.number_input("Concurrent requests", min_value=1, max_value=64, value=8)
+
+    batch_clicked = st.button("🚀 Scrape Batch", type="primary", disabled=csv_file is None)
+
+    if batch_clicked and csv_file is not None:
+        urls_df = pd.read_csv(csv_file)
+        url_column = 'url' if 'url' in urls_df.columns else urls_df.columns[0]
+        batch_urls = urls_df[url_column].dropna().astype(str).tolist()
+
+        if not batch_urls:
+            st.warning("No URLs found in the uploaded file")
+        else:
+            progress = st.progress(0.0, text=f"Scraping 0 of {len(batch_urls)} websites...")
+            table_placeholder = st.empty()
+            batch_rows = []
+
+            for done, result in enumerate(scrape_universal_batch(batch_urls, max_workers=max_workers, crawl=crawl_mode), start=1):
+                if result.get('error'):
+                    history_id = None
+                else:
+                    history_id = add_to_history(result)
+
+                batch_rows.append({
+                    'URL': result.get('url'),
+                    'Emails': len(result.get('emails', [])),
+                    'Phones': len(result.get('phones', [])),
+                    'Social Links': len(result.get('social_links', {})),
+                    'History ID': history_id,
+                    'Error': result.get('error') or ''
+                })
+
+                progress.progress(done / len(batch_urls), text=f"Scraping {done} of {len(batch_urls)} websites...")
+                table_placeholder.dataframe(pd.DataFrame(batch_rows), use_container_width=True, hide_index=True)
+
+            failed = sum(1 for row in batch_rows if row['Error'])
+            st.success(f"✅ Batch finished: {len(batch_rows) - failed} succeeded, {failed} failed")
+
 elif page == "Competitive Analysis":
     st.title("🔍 Competitive Intelligence")
     st.write("Analyze pricing structure and features from target websites.")
@@ -223,7 +313,8 @@ elif page == "Competitive Analysis":
                 'emails': [],
                 'phones': [],
                 'social_links': {},
-                'scraper_type': 'competitive_analysis'
+                'scraper_type': 'competitive_analysis',
+                'timings': hasil.get('timings', {})
             }
             history_id = add_to_history(history_entry)
             st.info(f"Analysis saved to history with ID: {history_id}")
@@ -281,5 +372,78 @@ elif page == "Competitive Analysis":
             st.warning(f"No pricing data found or error occurred: {error_msg}")
             st.info("Note: This scraper is specifically designed for the SaaSquatchLeads pricing page.")
 
+    # Many competitors at once, rendered concurrently in the shared browser
+    st.divider()
+    st.subheader("📋 Compare Multiple Competitors")
+
+    urls_col, options_col = st.columns([3, 1])
+
+    with urls_col:
+        competitor_urls_text = st.text_area(
+            "Competitor pricing URLs (one per line)",
+            placeholder="https://www.saasquatchleads.com/\nhttps://competitor.example.com/pricing"
+        )
+
+    with options_col:
+        max_concurrency = st.number_input("Pages at once", min_value=1, max_value=16, value=4)
+        page_timeout = st.number_input("Timeout per page (s)", min_value=5, max_value=300, value=60)
+
+    competitor_urls = [line.strip() for line in competitor_urls_text.splitlines() if line.strip()]
+    compare_clicked = st.button("📊 Analyze All", type="primary", disabled=not competitor_urls)
+
+    if compare_clicked and competitor_urls:
+        competitor_urls = list(dict.fromkeys(competitor_urls))
+        progress = st.progress(0.0, text=f"Analyzing 0 of {len(competitor_urls)} pages...")
+        summary_placeholder = st.empty()
+        summary_rows = []
+        combined_results = {}
+
+        for done, (competitor_url, result) in enumerate(
+                iter_pricing_pages(competitor_urls, max_concurrency=max_concurrency, page_timeout=page_timeout), start=1):
+            combined_results[competitor_url] = result
+            pricing_df = result.get('pricing_data', pd.DataFrame())
+
+            history_id = None
+            if not pricing_df.empty:
+                history_id = add_to_history({
+                    'website': competitor_url,
+                    'pricing_data': pricing_df.to_dict('records'),
+                    'emails': result.get('contact_info', {}).get('emails', []),
+                    'phones': result.get('contact_info', {}).get('phones', []),
+                    'social_links': {},
+                    'scraper_type': 'competitive_analysis',
+                    'timings': result.get('timings', {})
+                })
+
+            summary_rows.append({
+                'URL': competitor_url,
+                'Plans': max(len(pricing_df.columns) - 1, 0),
+                'Features': len(pricing_df),
+                'History ID': history_id,
+                'Error': result.get('error') or ''
+            })
+
+            progress.progress(done / len(competitor_urls), text=f"Analyzing {done} of {len(competitor_urls)} pages...")
+            summary_placeholder.dataframe(pd.DataFrame(summary_rows), use_container_width=True, hide_index=True)
+
+            if not pricing_df.empty:
+                with st.expander(f"💰 {competitor_url}"):
+                    st.dataframe(pricing_df, use_container_width=True, hide_index=True)
+
+        failed = sum(1 for row in summary_rows if row['Error'])
+        st.success(f"✅ Analysis finished: {len(summary_rows) - failed} succeeded, {failed} failed")
+
+        combined_frames = [
+            result['pricing_data'].assign(URL=competitor_url)
+            for competitor_url, result in combined_results.items() if not result['pricing_data'].empty
+        ]
+        if combined_frames:
+            st.download_button(
+                label="📥 Download Combined CSV",
+                data=pd.concat(combined_frames, ignore_index=True).to_csv(index=False),
+                file_name="competitor_pricing_analysis.csv",
+                mime="text/csv"
+            )
+
 elif page == "Contact Us":
     show_contact_section()
@@ -0,0 +1,83 @@
+# benchmarks/bench_parsers.py
+"""
+Parse time and memory per page for each parser backend.
+
+Usage:
+    python benchmarks/bench_parsers.py                 # synthetic 50 KB / 1 MB pages
+    python benchmarks/bench_parsers.py page1.html ...  # your own saved pages
+
+Peak memory comes from tracemalloc, which only sees Python allocations; the
+libxml2 tree built by the lxml backend is not counted.
+"""
+import argparse
+import gc
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from html_document import decode_html
+from parser_backend import PARSER_BACKENDS, available_backends
+
+def synthetic_page(target_bytes):
+    """A marketing-style page: nav links, text blocks, inline script and meta tags"""
+    head = ['<html><head><meta charset="utf-8">',
+            '<meta property="og:url" content="https://www.facebook.com/acme">',
+            '<script>window.__STATE__ = {"items": [' + ','.join(str(i) for i in range(2000)) + ']};</script>',
+            '</head><body>']
+    block = ('<div class="card"><h2>Feature {i}</h2><p>Lorem ipsum dolor sit amet, call +1 555 {i:04d} '
+             'or mail sales{i}@example.com.</p><a href="/product/{i}">More</a>'
+             '<a href="https://twitter.com/acme{i}">Twitter</a><img src="/img/{i}.png"></div>\n')
+    parts = head[:]
+    size = sum(len(p) for p in parts)
+    i = 0
+    while size < target_bytes:
+        chunk = block.format(i=i)
+        parts.append(chunk)
+        size += len(chunk)
+        i += 1
+    parts.append('</body></html>')
+    return ''.join(parts)
+
+def bench_backend(backend, text, repeat):
+    parse = PARSER_BACKENDS[backend]
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        parse(text)
+        timings.append(time.perf_counter() - start)
+
+    # Memory is measured on a separate run so tracing does not skew the timings
+    gc.collect()
+    tracemalloc.start()
+    links = parse(text)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(timings), peak, len(links.anchors)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('pages', nargs='*', help='HTML files to parse (default: synthetic pages)')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    if args.pages:
+        pages = []
+        for path in args.pages:
+            with open(path, 'rb') as f:
+                pages.append((os.path.basename(path), decode_html(f.read())[0]))
+    else:
+        pages = [('synthetic-50KB', synthetic_page(50_000)), ('synthetic-1MB', synthetic_page(1_000_000))]
+
+    print(f"{'page':<24}{'backend':<16}{'bytes':>10}{'median ms':>12}{'peak MB':>10}{'anchors':>9}")
+    for name, text in pages:
+        for backend in available_backends():
+            seconds, peak, anchors = bench_backend(backend, text, args.repeat)
+            print(f"{name:<24}{backend:<16}{len(text.encode('utf-8')):>10}{seconds * 1000:>12.1f}{peak / 1e6:>10.1f}{anchors:>9}")
+
+if __name__ == '__main__':
+    main()
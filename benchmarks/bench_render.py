@@ -0,0 +1,114 @@
+# benchmarks/bench_render.py
+"""
+Wall time and bytes transferred to render a pricing page, full vs lean profile.
+
+Usage:
+    python benchmarks/bench_render.py URL --record page.har   # record the page once
+    python benchmarks/bench_render.py URL --har page.har      # replay it for both profiles
+    python benchmarks/bench_render.py URL                     # live network
+    python benchmarks/bench_render.py URL --har page.har --output render.json   # also save the medians
+
+Each run uses a fresh browser context so the HTTP cache is cold. Time is
+measured from goto() until the selector is attached; bytes are the response
+body and header sizes of every request that finished. With --har, requests
+missing from the recording are aborted so both profiles see the same page.
+Results are saved as JSON (default: benchmarks/results/render-<commit>.json)
+so they can be quoted next to the change they measure.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from playwright.async_api import async_playwright
+
+from bench_suite import DEFAULT_RESULTS, git_commit
+from render_profile import get_render_profile
+from scraper import PRICING_TABLE_SELECTOR
+
+async def record(browser, url, har_path):
+    context = await browser.new_context(record_har_path=har_path, record_har_content='embed')
+    page = await context.new_page()
+    await page.goto(url, timeout=120000, wait_until='networkidle')
+    # The HAR is written when the context closes
+    await context.close()
+
+async def render_once(browser, url, profile, selector, har_path=None):
+    context = await browser.new_context()
+    if har_path:
+        await context.route_from_har(har_path, not_found='abort')
+    page = await context.new_page()
+
+    finished = []
+    page.on('requestfinished', lambda request: finished.append(request))
+    await profile.apply(page, url)
+
+    start = time.perf_counter()
+    await page.goto(url, timeout=120000, wait_until=profile.wait_until)
+    await page.wait_for_selector(selector, state='attached', timeout=30000)
+    seconds = time.perf_counter() - start
+
+    transferred = 0
+    for request in finished:
+        sizes = await request.sizes()
+        transferred += sizes['responseBodySize'] + sizes['responseHeadersSize']
+    await context.close()
+    return seconds, transferred, len(finished)
+
+async def run(args):
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        try:
+            if args.record:
+                await record(browser, args.url, args.record)
+                print(f"Recorded {args.url} to {args.record}")
+                return
+
+            print(f"{'profile':<8}{'median s':>10}{'median KB':>12}{'requests':>10}")
+            profiles = {}
+            for name in ('full', 'lean'):
+                profile = get_render_profile(name)
+                runs = [await render_once(browser, args.url, profile, args.selector, args.har)
+                        for _ in range(args.repeat)]
+                profiles[name] = {
+                    'median_s': round(statistics.median(r[0] for r in runs), 3),
+                    'median_kb': round(statistics.median(r[1] for r in runs) / 1024, 1),
+                    'requests': statistics.median(r[2] for r in runs),
+                }
+                print(f"{name:<8}{profiles[name]['median_s']:>10.2f}{profiles[name]['median_kb']:>12.0f}"
+                      f"{profiles[name]['requests']:>10.0f}")
+        finally:
+            await browser.close()
+
+    results = {
+        'commit': git_commit(),
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'url': args.url,
+        'har': os.path.basename(args.har) if args.har else None,
+        'repeat': args.repeat,
+        'profiles': profiles,
+    }
+    output = args.output or os.path.join(DEFAULT_RESULTS, f"render-{results['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"Saved {output}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('url')
+    parser.add_argument('--har', help='replay this HAR recording instead of the live site')
+    parser.add_argument('--record', metavar='HAR', help='record the page to a HAR file and exit')
+    parser.add_argument('--selector', default=PRICING_TABLE_SELECTOR)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', help='where to save the JSON results')
+    asyncio.run(run(parser.parse_args()))
+
+if __name__ == '__main__':
+    main()
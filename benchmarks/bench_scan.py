@@ -0,0 +1,87 @@
+# benchmarks/bench_scan.py
+"""
+Bytes scanned and extraction time per page, raw HTML vs visible-text scanning.
+
+Usage:
+    python benchmarks/bench_scan.py                 # synthetic landing page and SPA page
+    python benchmarks/bench_scan.py page1.html ...  # your own saved pages
+
+"bytes scanned" is the UTF-8 size of the str the email, phone and social
+regexes run over. Time covers building that str (for the visible mode:
+cutting script/style/svg and joining the attribute values) plus extraction;
+link parsing is shared by both modes and done up front.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from contact_extractor import extract_contacts
+from html_document import HtmlDocument
+from text_regions import RAW_SCAN, VISIBLE_SCAN, TextRegions
+
+def synthetic_landing_page(blocks=200):
+    """Mostly visible markup with a small inline script"""
+    parts = ['<html><head><meta charset="utf-8"><meta property="og:url" content="https://www.facebook.com/acme">',
+             '<script>window.dataLayer = [];</script></head><body>']
+    for i in range(blocks):
+        parts.append(f'<div class="card"><h2>Feature {i}</h2><p>Lorem ipsum dolor sit amet, order #{100000 + i}.'
+                     f'</p><a href="/product/{i}">More</a></div>\n')
+    parts.append('<footer>Call +1 (415) 555-2671 or mail <a href="mailto:sales@example.com">sales@example.com</a>'
+                 '<a href="https://twitter.com/acme">Twitter</a></footer></body></html>')
+    return ''.join(parts)
+
+def synthetic_spa_page(items=5000):
+    """A client-rendered page: a big JSON state blob, inline SVG icons, little visible text"""
+    state = {'props': {'pageProps': {'products': [
+        {'id': 4150000000 + i, 'sku': f'{i:07d}', 'price': 1000 + i * 7, 'updated': f'2024-01-{i % 28 + 1:02d}'}
+        for i in range(items)]}}}
+    icon = ('<svg viewBox="0 0 24 24"><path d="M12 2C6.48 2 2 6.48 2 12s4.48 10 10 10 10-4.48 '
+            '10-10S17.52 2 12 2zm0 18c-4.41 0-8-3.59-8-8s3.59-8 8-8 8 3.59 8 8-3.59 8-8 8z"/></svg>')
+    return ('<html><head><meta charset="utf-8"><style>' + '.c{margin:0 4px 8px 16px}' * 200 + '</style></head><body>'
+            '<div id="__next">' + icon * 100 +
+            '<p>Questions? Call +1 (415) 555-2671 or write to <a href="mailto:hello@example.com">us</a>.</p></div>'
+            '<script id="__NEXT_DATA__" type="application/json">' + json.dumps(state) + '</script></body></html>')
+
+def bench_mode(document, mode, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        if mode == RAW_SCAN:
+            scan_text = document.text
+        else:
+            # Rebuilt every round so the time includes the region stage
+            scan_text = TextRegions(document.text, document.links).scan_text
+        emails, phones, _ = extract_contacts(scan_text, document.links)
+        timings.append(time.perf_counter() - start)
+    return len(scan_text.encode('utf-8')), statistics.median(timings), len(emails), len(phones)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('pages', nargs='*', help='HTML files to scan (default: synthetic pages)')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    if args.pages:
+        pages = []
+        for path in args.pages:
+            with open(path, 'rb') as f:
+                pages.append((os.path.basename(path), f.read()))
+    else:
+        pages = [('synthetic-landing', synthetic_landing_page().encode('utf-8')),
+                 ('synthetic-spa', synthetic_spa_page().encode('utf-8'))]
+
+    print(f"{'page':<24}{'mode':<9}{'bytes scanned':>14}{'median ms':>11}{'emails':>8}{'phones':>8}")
+    for name, content in pages:
+        document = HtmlDocument('', content, 'text/html')
+        document.links  # parsed once up front; both modes share it
+        for mode in (RAW_SCAN, VISIBLE_SCAN):
+            scanned, seconds, emails, phones = bench_mode(document, mode, args.repeat)
+            print(f"{name:<24}{mode:<9}{scanned:>14}{seconds * 1000:>11.1f}{emails:>8}{phones:>8}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,261 @@
+# benchmarks/bench_suite.py
+"""
+Offline extraction benchmark over a recorded corpus.
+
+Usage:
+    python benchmarks/bench_suite.py                          # run (generates the corpus on first use)
+    python benchmarks/bench_suite.py --record URL [URL ...]   # add live pages to the corpus
+    python benchmarks/bench_suite.py --record-pricing URL     # ... as pricing pages
+    python benchmarks/bench_suite.py --output a.json          # save results (default: benchmarks/results/<commit>.json)
+    python benchmarks/bench_suite.py --compare a.json b.json  # diff two saved runs
+
+Every request goes through http_session.fetch_html with the shared session's
+transport replaced by benchmarks/replay.py, so the scheduler, byte cap,
+decoding, parsing and extraction all run exactly as in production, just
+without the network. The scheduler's per-host delay is set to 0.
+
+The generated corpus has small (30 KB), 1 MB and 10 MB contact pages, each
+with a charset in Content-Type and without any declared charset, plus a
+server-rendered pricing page for the scraper.scrape_saasquatch parsers.
+Pages past max_body_kb are cut like in production; MB/s counts the bytes
+actually read.
+
+Stages: fetch (transport + capped read), decode, links, regions, contacts
+and, for pricing pages, pricing. Peak RSS is the process high-water mark.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+try:
+    import resource
+except ImportError:
+    # Windows
+    resource = None
+
+import scheduler
+from contact_extractor import extract_contacts
+from html_document import HtmlDocument
+from http_session import fetch_html
+from replay import ReplayCorpus, install_replay, record_pages
+from scraper import _pricing_rows_from_payload, extract_next_data, parse_pricing_table
+from universal_scraper import DEFAULT_HEADERS
+
+DEFAULT_CORPUS = os.path.join(BENCH_DIR, 'corpus')
+DEFAULT_RESULTS = os.path.join(BENCH_DIR, 'results')
+CORPUS_HOST = 'http://corpus.bench'
+CONTACT_STAGES = ('fetch', 'decode', 'links', 'regions', 'contacts')
+PRICING_STAGES = ('fetch', 'decode', 'pricing')
+
+SIZES = (('small', 30_000), ('1mb', 1_000_000), ('10mb', 10_000_000))
+
+def synthetic_contact_page(target_bytes, seed, declare_charset):
+    """A marketing page: inline JSON state, nav, text blocks with numbers and links, a contact footer"""
+    rng = random.Random(seed)
+    head = '<meta charset="utf-8">' if declare_charset else ''
+    parts = [f'<html><head>{head}<title>Acme Café</title>'
+             '<meta property="og:url" content="https://www.facebook.com/acme">',
+             '<script>window.__STATE__ = ' + json.dumps({'ids': [rng.randint(10**6, 10**9) for _ in range(500)]}) +
+             ';</script></head><body><nav><a href="/">Home</a><a href="/about">Über uns</a></nav>']
+    size = sum(len(p) for p in parts)
+    i = 0
+    while size < target_bytes:
+        block = (f'<div class="card"><h2>Produkt {i} – Crème</h2><p>Order #{rng.randint(10**5, 10**8)} ships '
+                 f'on 2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} for ${rng.randint(5, 999)}.99. '
+                 f'Lorem ipsum dolor sit amet, consectetur adipiscing elit.</p>'
+                 f'<a href="/product/{i}">Mehr</a></div>\n')
+        if i % 250 == 0:
+            block += (f'<p>Sales: <a href="mailto:sales{i}@acme.example">sales{i}@acme.example</a>, '
+                      f'call +1 (415) 555-{2600 + i % 100:04d}</p><a href="https://twitter.com/acme{i}">Twitter</a>\n')
+        parts.append(block)
+        size += len(block)
+        i += 1
+    parts.append('</body></html>')
+    return ''.join(parts).encode('utf-8')
+
+def synthetic_pricing_page(plans=4, features=400):
+    headers = ''.join(f'<th>Plan {p}</th>' for p in range(plans))
+    rows = ''.join(
+        f'<tr><td>Feature {f}</td>' + ''.join('<td>✔️</td>' if (f + p) % 3 else '<td>—</td>' for p in range(plans)) + '</tr>'
+        for f in range(features))
+    prices = ''.join(f'<td>${p * 49}</td>' for p in range(plans))
+    return ('<html><head><meta charset="utf-8"></head><body><h1>Pricing</h1>'
+            '<a href="mailto:sales@acme.example">Sales</a> Call (415) 555-2671'
+            f'<table class="jsx-c15ddf1490db7a4f"><thead><tr><th>Features</th>{headers}</tr></thead>'
+            f'<tbody>{rows}</tbody><tfoot><tr><td>Price</td>{prices}</tr><tr><td></td>'
+            + '<td>Buy</td>' * plans + '</tr></tfoot></table></body></html>').encode('utf-8')
+
+def generate_corpus(corpus):
+    for label, size in SIZES:
+        for declare_charset in (True, False):
+            name = f"{label}-{'charset' if declare_charset else 'nocharset'}"
+            content_type = 'text/html; charset=utf-8' if declare_charset else 'text/html'
+            body = synthetic_contact_page(size, seed=size, declare_charset=declare_charset)
+            corpus.add(name, f"{CORPUS_HOST}/{name}", body, {'Content-Type': content_type})
+    corpus.add('pricing-table', f"{CORPUS_HOST}/pricing", synthetic_pricing_page(),
+               {'Content-Type': 'text/html; charset=utf-8'}, kind='pricing')
+    print(f"Generated {len(corpus)} pages in {corpus.directory}")
+
+def _timed(timings, stage, func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    timings.setdefault(stage, []).append(time.perf_counter() - start)
+    return result
+
+def run_page(entry, timings):
+    """One pass over one page; returns the number of body bytes read"""
+    response, content, _ = _timed(timings, 'fetch', fetch_html, entry['url'], DEFAULT_HEADERS)
+    response.raise_for_status()
+    document = _timed(timings, 'decode', HtmlDocument, response.url, content,
+                      response.headers.get('Content-Type', ''))
+    if entry.get('kind') == 'pricing':
+        def pricing():
+            return (_pricing_rows_from_payload(extract_next_data(document.text))
+                    or parse_pricing_table(document.soup))
+        if not _timed(timings, 'pricing', pricing):
+            raise RuntimeError(f"No pricing rows found in {entry['name']}")
+    else:
+        _timed(timings, 'links', lambda: document.links)
+        _timed(timings, 'regions', lambda: document.regions)
+        _timed(timings, 'contacts', lambda: extract_contacts(document.scan_text(), document.links))
+    return len(content)
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+def _stage_summary(timings):
+    return {stage: {'p50_ms': round(_percentile(values, 50) * 1000, 3),
+                    'p99_ms': round(_percentile(values, 99) * 1000, 3),
+                    'count': len(values)}
+            for stage, values in timings.items()}
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=BENCH_DIR, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+def run_suite(corpus, repeat):
+    install_replay(corpus)
+    # Every corpus page lives on one host; pacing would only measure the sleep
+    scheduler._scheduler = scheduler.PolitenessScheduler(request_delay=0, max_retries=0)
+
+    pages = {}
+    all_timings = {}
+    total_bytes = 0
+    total_pages = 0
+    start = time.perf_counter()
+    for entry in corpus.entries:
+        timings = {}
+        page_bytes = 0
+        for _ in range(repeat):
+            page_bytes = run_page(entry, timings)
+            total_bytes += page_bytes
+            total_pages += 1
+        for stage, values in timings.items():
+            all_timings.setdefault(stage, []).extend(values)
+        page_seconds = sum(sum(values) for values in timings.values())
+        pages[entry['name']] = {
+            'kind': entry.get('kind', 'contact'),
+            'corpus_bytes': entry['bytes'],
+            'bytes_read': page_bytes,
+            'pages_per_s': round(repeat / page_seconds, 2),
+            'stages': _stage_summary(timings),
+        }
+    elapsed = time.perf_counter() - start
+
+    return {
+        'commit': git_commit(),
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': repeat,
+        'pages_per_s': round(total_pages / elapsed, 2),
+        'mb_per_s': round(total_bytes / 1e6 / elapsed, 2),
+        'peak_rss_mb': peak_rss_mb(),
+        'stages': _stage_summary(all_timings),
+        'pages': pages,
+    }
+
+def print_report(results):
+    print(f"commit {results['commit']}  {results['pages_per_s']} pages/s  {results['mb_per_s']} MB/s  "
+          f"peak RSS {results['peak_rss_mb']} MB")
+    print(f"{'page':<20}{'stage':<10}{'p50 ms':>10}{'p99 ms':>10}")
+    for name, page in results['pages'].items():
+        for stage, summary in page['stages'].items():
+            print(f"{name:<20}{stage:<10}{summary['p50_ms']:>10.2f}{summary['p99_ms']:>10.2f}")
+            name = ''
+
+def compare(old_path, new_path):
+    """Print the relative change of every headline number and stage p50/p99 between two runs"""
+    with open(old_path, 'r', encoding='utf-8') as f:
+        old = json.load(f)
+    with open(new_path, 'r', encoding='utf-8') as f:
+        new = json.load(f)
+
+    def row(label, before, after):
+        if before is None or after is None:
+            return
+        change = f"{(after - before) / before * 100:+.1f}%" if before else 'n/a'
+        print(f"{label:<32}{before:>12.2f}{after:>12.2f}{change:>10}")
+
+    print(f"{'metric':<32}{old['commit']:>12}{new['commit']:>12}{'change':>10}")
+    for key in ('pages_per_s', 'mb_per_s', 'peak_rss_mb'):
+        row(key, old.get(key), new.get(key))
+    for stage, summary in new['stages'].items():
+        if stage in old['stages']:
+            for pct in ('p50_ms', 'p99_ms'):
+                row(f"{stage} {pct}", old['stages'][stage][pct], summary[pct])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--corpus', default=DEFAULT_CORPUS, help='corpus directory')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', help='where to save the JSON results')
+    parser.add_argument('--record', nargs='+', metavar='URL', help='record contact pages into the corpus and exit')
+    parser.add_argument('--record-pricing', nargs='+', metavar='URL', help='record pricing pages and exit')
+    parser.add_argument('--regenerate', action='store_true', help='rebuild the synthetic pages')
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help='diff two saved result files')
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    corpus = ReplayCorpus(args.corpus)
+    if args.record or args.record_pricing:
+        record_pages(corpus, args.record or [], kind='contact')
+        record_pages(corpus, args.record_pricing or [], kind='pricing')
+        return
+    if args.regenerate or not len(corpus):
+        generate_corpus(corpus)
+
+    results = run_suite(corpus, args.repeat)
+    print_report(results)
+
+    output = args.output or os.path.join(DEFAULT_RESULTS, f"{results['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"Saved {output}")
+
+if __name__ == '__main__':
+    main()
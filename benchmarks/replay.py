@@ -0,0 +1,109 @@
+# benchmarks/replay.py
+"""
+Record/replay transport for offline benchmarks.
+
+A corpus is a directory with one body file per page and an index.json
+holding each page's URL, status and response headers. ReplayAdapter serves
+those pages to the shared requests session, so http_session.fetch and
+everything above it run unchanged without touching the network.
+"""
+import io
+import json
+import os
+import re
+from urllib.parse import urlparse
+
+from requests.adapters import BaseAdapter, HTTPAdapter
+from urllib3 import HTTPResponse
+
+from http_session import fetch, get_session
+
+INDEX_FILE = 'index.json'
+# Bodies are stored decoded, so headers describing the wire encoding are dropped
+WIRE_HEADERS = {'content-encoding', 'transfer-encoding', 'content-length', 'connection', 'keep-alive'}
+
+class ReplayCorpus:
+    """Recorded pages keyed by URL"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.entries = []
+        index_path = os.path.join(directory, INDEX_FILE)
+        if os.path.exists(index_path):
+            with open(index_path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+        self._by_url = {entry['url']: entry for entry in self.entries}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def lookup(self, url):
+        return self._by_url.get(url)
+
+    def body(self, entry):
+        with open(os.path.join(self.directory, entry['file']), 'rb') as f:
+            return f.read()
+
+    def add(self, name, url, body, headers, status=200, kind='contact'):
+        """Store one page (replacing an earlier one with the same name) and rewrite the index"""
+        os.makedirs(self.directory, exist_ok=True)
+        file_name = f"{name}.body"
+        with open(os.path.join(self.directory, file_name), 'wb') as f:
+            f.write(body)
+        headers = {k: v for k, v in headers.items() if k.lower() not in WIRE_HEADERS}
+        entry = {'name': name, 'url': url, 'file': file_name, 'status': status, 'headers': headers,
+                 'kind': kind, 'bytes': len(body)}
+
+        self.entries = [e for e in self.entries if e['name'] != name] + [entry]
+        self._by_url = {e['url']: e for e in self.entries}
+        with open(os.path.join(self.directory, INDEX_FILE), 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, indent=2)
+        return entry
+
+class ReplayAdapter(BaseAdapter):
+    """requests transport answering from a ReplayCorpus; unknown URLs get a 404"""
+
+    def __init__(self, corpus):
+        super().__init__()
+        self.corpus = corpus
+        # Only used for its build_response(), which turns a urllib3 response into a requests one
+        self._builder = HTTPAdapter()
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        entry = self.corpus.lookup(request.url)
+        if entry is None:
+            body, status, headers = b'', 404, {}
+        else:
+            body, status, headers = self.corpus.body(entry), entry['status'], entry['headers']
+        raw = HTTPResponse(
+            body=io.BytesIO(body),
+            headers={**headers, 'Content-Length': str(len(body))},
+            status=status,
+            preload_content=False,
+            decode_content=False,
+        )
+        response = self._builder.build_response(request, raw)
+        if not stream:
+            response.content
+        return response
+
+    def close(self):
+        self._builder.close()
+
+def install_replay(corpus):
+    """Route every request of the shared session to the corpus"""
+    adapter = ReplayAdapter(corpus)
+    session = get_session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return adapter
+
+def record_pages(corpus, urls, kind='contact'):
+    """Fetch live pages once (full body, no byte cap) and add them to the corpus"""
+    for url in urls:
+        response = fetch(url)
+        response.raise_for_status()
+        parsed = urlparse(url)
+        name = re.sub(r'[^A-Za-z0-9]+', '-', f"{parsed.netloc}{parsed.path}").strip('-')[:80]
+        corpus.add(name, url, response.content, dict(response.headers), response.status_code, kind)
+        print(f"Recorded {url} ({len(response.content)} bytes) as {name}")
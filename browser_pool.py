@@ -0,0 +1,186 @@
+# browser_pool.py
+import asyncio
+import atexit
+import importlib.util
+import logging
+import threading
+
+# Playwright is optional; without it every browser job fails and callers fall back to static fetching.
+# Only its presence is checked here: the import itself costs ~100 ms and waits for the first launch.
+PLAYWRIGHT_AVAILABLE = importlib.util.find_spec('playwright') is not None
+
+from settings import get_setting
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONTEXTS = 4
+DEFAULT_CONTEXT_MAX_USES = 20
+
+class BrowserPool:
+    """
+    One long-lived Chromium process shared by every scrape in this process.
+
+    Playwright objects are bound to the event loop that created them, so the
+    browser lives on a dedicated background thread with its own asyncio loop.
+    Callers on any thread (e.g. Streamlit sessions) submit jobs with run() or
+    submit(); each job gets a fresh page inside a browser context taken from
+    a bounded pool. A context is recycled after `context_max_uses` jobs or as
+    soon as a job using it fails; a crashed browser is relaunched on demand.
+    """
+
+    def __init__(self, max_contexts=DEFAULT_MAX_CONTEXTS, context_max_uses=DEFAULT_CONTEXT_MAX_USES, headless=True):
+        self.max_contexts = max_contexts
+        self.context_max_uses = context_max_uses
+        self.headless = headless
+
+        self._loop = None
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+        # Only touched from the pool's event loop
+        self._playwright = None
+        self._browser = None
+        self._semaphore = None
+        self._idle_contexts = []
+        self.launch_count = 0
+
+    # --- lifecycle -----------------------------------------------------------
+
+    def start(self):
+        """
+        Start the event loop thread (idempotent). Playwright and the browser are
+        only launched by the first job that needs a page, so coroutines that
+        end up not rendering anything (see scraper.scrape_pricing) never pay for them.
+        """
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(target=self._loop.run_forever, name='browser-pool', daemon=True)
+            self._thread.start()
+
+    async def _ensure_browser(self):
+        if not PLAYWRIGHT_AVAILABLE:
+            raise RuntimeError("Playwright is not installed (pip install playwright && playwright install chromium)")
+        if self._playwright is None:
+            from playwright.async_api import async_playwright
+            self._playwright = await async_playwright().start()
+        if self._browser is None or not self._browser.is_connected():
+            if self._browser is not None:
+                logger.warning("Browser disconnected, relaunching")
+            # Contexts of a dead browser are unusable
+            self._idle_contexts = []
+            self._browser = await self._playwright.chromium.launch(headless=self.headless)
+            self.launch_count += 1
+
+    def shutdown(self):
+        """Close every context, the browser and Playwright, then stop the loop thread"""
+        with self._start_lock:
+            if self._thread is None:
+                return
+            try:
+                asyncio.run_coroutine_threadsafe(self._close(), self._loop).result(timeout=30)
+            except Exception as e:
+                logger.warning(f"Error while closing browser pool: {str(e)}")
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=10)
+            self._thread = None
+            self._loop = None
+
+    async def _close(self):
+        for context, _ in self._idle_contexts:
+            await _close_quietly(context)
+        self._idle_contexts = []
+        if self._browser is not None:
+            await _close_quietly(self._browser)
+            self._browser = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    # --- context pool --------------------------------------------------------
+
+    async def _acquire_context(self):
+        if self._semaphore is None:
+            # Created on the loop thread, which is the only one touching it
+            self._semaphore = asyncio.Semaphore(self.max_contexts)
+        await self._semaphore.acquire()
+        try:
+            await self._ensure_browser()
+            if self._idle_contexts:
+                return self._idle_contexts.pop()
+            return await self._browser.new_context(), 0
+        except BaseException:
+            # Including cancellation, e.g. a caller's asyncio.wait_for running out
+            self._semaphore.release()
+            raise
+
+    async def _release_context(self, context, uses, broken):
+        try:
+            if broken or uses >= self.context_max_uses or not self._browser.is_connected():
+                await _close_quietly(context)
+            else:
+                self._idle_contexts.append((context, uses))
+        finally:
+            self._semaphore.release()
+
+    async def run_async(self, job, *args, **kwargs):
+        """Run `await job(page, *args, **kwargs)` on a new page from a pooled context"""
+        context, uses = await self._acquire_context()
+        broken = True
+        try:
+            page = await context.new_page()
+            try:
+                result = await job(page, *args, **kwargs)
+            finally:
+                await _close_quietly(page)
+            broken = False
+            return result
+        finally:
+            await self._release_context(context, uses + 1, broken)
+
+    # --- thread-safe entry points -------------------------------------------
+
+    def call(self, coroutine_function, *args, **kwargs):
+        """Run any coroutine function on the pool's loop; returns a concurrent.futures.Future"""
+        self.start()
+        return asyncio.run_coroutine_threadsafe(coroutine_function(*args, **kwargs), self._loop)
+
+    def submit(self, job, *args, **kwargs):
+        """Schedule a job from any thread; returns a concurrent.futures.Future"""
+        return self.call(self.run_async, job, *args, **kwargs)
+
+    def run(self, job, *args, timeout=None, **kwargs):
+        """Run a job from any thread and wait for its result"""
+        return self.submit(job, *args, **kwargs).result(timeout)
+
+async def _close_quietly(target):
+    try:
+        await target.close()
+    except Exception:
+        pass
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_browser_pool():
+    """Process-wide pool configured from config.ini [browser_settings]; closed at exit"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = BrowserPool(
+                    max_contexts=get_setting('browser_settings', 'max_contexts', DEFAULT_MAX_CONTEXTS, int),
+                    context_max_uses=get_setting('browser_settings', 'context_max_uses', DEFAULT_CONTEXT_MAX_USES, int),
+                    headless=get_setting('browser_settings', 'headless', True, bool),
+                )
+                atexit.register(shutdown_browser_pool)
+    return _pool
+
+def shutdown_browser_pool():
+    """Clean shutdown hook for the shared pool"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None
@@ -0,0 +1,126 @@
+# cli.py
+"""
+Headless runner for scheduled scrapes; results go to the history store.
+
+Usage:
+    python -m cli contact https://example.com [URL ...] [--crawl]
+    python -m cli batch urls.txt [--workers 8] [--crawl]      # one URL per line, '-' for stdin
+    python -m cli pricing https://example.com/pricing [URL ...] [--timeout 60]
+
+Each result is printed as one JSON line (or written to --output). The exit
+status is 1 when any URL failed. Only the modules a command needs are
+imported: contact and batch never load streamlit, pandas, playwright or
+bs4 unless a page actually needs the browser or a full parse tree.
+"""
+import argparse
+import json
+import logging
+import sys
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+def _save_to_history(record):
+    """Same record shape add_to_history writes, without going through the Streamlit dashboard"""
+    import history_store
+
+    record['timestamp'] = datetime.now().isoformat()
+    record['id'] = history_store.add_record(record)
+    return record['id']
+
+def _read_urls(sources):
+    for source in sources:
+        handle = sys.stdin if source == '-' else open(source, 'r', encoding='utf-8')
+        try:
+            for line in handle:
+                line = line.strip()
+                if line and not line.startswith('#'):
+                    yield line
+        finally:
+            if handle is not sys.stdin:
+                handle.close()
+
+def _contact_results(args):
+    from universal_scraper import crawl_universal_contact, scrape_universal_batch, scrape_universal_contact
+
+    if args.command == 'batch':
+        yield from scrape_universal_batch(_read_urls(args.sources), max_workers=args.workers, crawl=args.crawl)
+        return
+    for url in args.urls:
+        if args.crawl:
+            result = crawl_universal_contact(url, max_depth=args.max_depth, max_pages=args.max_pages)
+        else:
+            result = scrape_universal_contact(url)
+        result.setdefault('url', url)
+        yield result
+
+def _pricing_results(args):
+    from scraper import iter_pricing_pages
+
+    for url, result in iter_pricing_pages(args.urls, max_concurrency=args.concurrency, page_timeout=args.timeout):
+        pricing_df = result.get('pricing_data')
+        contact_info = result.get('contact_info') or {}
+        # Same record app.py stores for a competitive analysis
+        yield {
+            'website': url,
+            'url': url,
+            'pricing_data': pricing_df.to_dict('records') if pricing_df is not None else [],
+            'emails': contact_info.get('emails', []),
+            'phones': contact_info.get('phones', []),
+            'social_links': {},
+            'scraper_type': 'competitive_analysis',
+            'fetch_strategy': result.get('fetch_strategy'),
+            'timings': result.get('timings', {}),
+            **({'error': result['error']} if result.get('error') else {}),
+        }
+
+def run(args):
+    results = _pricing_results(args) if args.command == 'pricing' else _contact_results(args)
+    output = open(args.output, 'a', encoding='utf-8') if args.output else sys.stdout
+    failures = 0
+    try:
+        for result in results:
+            if result.get('error') or (args.command == 'pricing' and not result['pricing_data']):
+                failures += 1
+            elif not args.no_history:
+                _save_to_history(result)
+            output.write(json.dumps(result, ensure_ascii=False, default=str) + '\n')
+            output.flush()
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    return 1 if failures else 0
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m cli', description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--output', '-o', help='append JSON lines to this file instead of stdout')
+    parser.add_argument('--no-history', action='store_true', help='do not write results to the history store')
+    parser.add_argument('--verbose', '-v', action='store_true')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    contact = commands.add_parser('contact', help='scrape contact details of one or more websites')
+    contact.add_argument('urls', nargs='+')
+    contact.add_argument('--crawl', action='store_true', help='follow same-site links such as /contact and /about')
+    contact.add_argument('--max-depth', type=int, default=2)
+    contact.add_argument('--max-pages', type=int, default=10)
+
+    batch = commands.add_parser('batch', help='scrape a list of websites concurrently')
+    batch.add_argument('sources', nargs='+', metavar='FILE', help="files with one URL per line, '-' for stdin")
+    batch.add_argument('--workers', type=int, default=8)
+    batch.add_argument('--crawl', action='store_true')
+
+    pricing = commands.add_parser('pricing', help='scrape pricing tables')
+    pricing.add_argument('urls', nargs='+')
+    pricing.add_argument('--timeout', type=float, default=60, help='seconds per page')
+    pricing.add_argument('--concurrency', type=int, default=4)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING,
+                        format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+    return run(args)
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,8 +1,10 @@
 # contact_component.py
 import streamlit as st
-import requests
 from bs4 import BeautifulSoup
 
+from http_session import fetch, get_session
+from scheduler import get_scheduler, request_timeout
+
 def scrape_contact_form():
     """
     Scrape contact form dari website SaaSQuatchLeads
@@ -13,7 +15,7 @@ def scrape_contact_form():
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
         
-        response = requests.get(url, headers=headers, timeout=10)
+        response = fetch(url, headers=headers)
         soup = BeautifulSoup(response.content, 'html.parser')
         
         contact_section = soup.find('section', {'id': 'contact-us-section'})
@@ -154,7 +156,9 @@ def show_contact_section():
                             '_next': 'https://your-website.com/thank-you', '_captcha': 'false'
                         }
                         
-                        response = requests.post(form_action, data=form_data_dict, timeout=10)
+                        # Paced like every other request to the host, but never retried (not idempotent)
+                        with get_scheduler().slot(form_action):
+                            response = get_session().post(form_action, data=form_data_dict, timeout=request_timeout())
                         
                         if response.status_code == 200:
                             st.success("✅ Message sent successfully!")
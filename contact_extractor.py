@@ -0,0 +1,109 @@
+# contact_extractor.py
+import re
+
+from phone_normalizer import find_phones
+
+# Semua pola dikompilasi sekali saat import, bukan setiap kali halaman di-scrape
+
+# Extract emails - pattern sudah benar
+EMAIL_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+
+LINK_SPLIT_RE = re.compile(r'["\'<>]')
+
+SOCIAL_PATTERNS = {
+    'facebook': r'https?://(?:www\.)?facebook\.com/[A-Za-z0-9_.-]+',
+    'twitter': r'https?://(?:www\.)?twitter\.com/[A-Za-z0-9_]+',
+    'linkedin': r'https?://(?:www\.)?linkedin\.com/(?:company|in)/[A-Za-z0-9_.-]+',
+    'instagram': r'https?://(?:www\.)?instagram\.com/[A-Za-z0-9_.-]+',
+    'youtube': r'https?://(?:www\.)?youtube\.com/(?:channel/|user/|@)[A-Za-z0-9_.-]+',
+    'whatsapp': r'https?://(?:wa\.me|api\.whatsapp\.com)/[\d+]+'
+}
+
+# Every social link starts with a scheme, so the document is scanned once for
+# "http(s)://" and the combined alternation is only tried at those positions.
+# At most one branch can match at a given position because every platform has
+# a distinct host.
+SCHEME_RE = re.compile(r'https?://', re.IGNORECASE)
+SOCIAL_RE = re.compile(
+    '|'.join(f'(?P<{platform}>{pattern})' for platform, pattern in SOCIAL_PATTERNS.items()),
+    re.IGNORECASE
+)
+
+def extract_emails(text):
+    """Return the unique email addresses found in the text"""
+    return list(set(EMAIL_RE.findall(text)))
+
+def extract_phones(text, hrefs=()):
+    """Return the unique phone numbers in the text and tel: links, normalized by phone_normalizer"""
+    tel_links = [href for href in hrefs if href.strip().lower().startswith('tel:')]
+    return find_phones(text, tel_links)
+
+def find_social_matches(text):
+    """Scan the text once and return {platform: [links in document order]}"""
+    found = {}
+    last_end = {}
+    for scheme in SCHEME_RE.finditer(text):
+        match = SOCIAL_RE.match(text, scheme.start())
+        if match is None:
+            continue
+        platform = match.lastgroup
+        # Same result as a separate scan per platform: a link that starts inside
+        # the previous link of the same platform is skipped, one that starts
+        # inside a link of another platform is kept
+        if match.start() < last_end.get(platform, 0):
+            continue
+        last_end[platform] = match.end()
+        found.setdefault(platform, []).append(match.group())
+    return found
+
+def extract_social_links(text, meta_contents=(), hrefs=()):
+    """
+    Build the social links dict from the page text plus <meta content> and <a href> values.
+
+    Page text matches come first (extra links per platform become facebook_1,
+    facebook_2, ...); meta and anchor values only fill platforms still missing.
+    """
+    social_links = {}
+    found = find_social_matches(text)
+
+    for platform in SOCIAL_PATTERNS:
+        for link in found.get(platform, ()):
+            # Pastikan link tidak mengandung karakter yang tidak diinginkan
+            if '"' in link or "'" in link or '>' in link or '<' in link:
+                link = LINK_SPLIT_RE.split(link)[0]
+
+            if platform not in social_links:
+                social_links[platform] = link
+            elif link not in social_links.values():
+                # Jika platform sudah ada, tambahkan dengan angka
+                count = 1
+                while f"{platform}_{count}" in social_links:
+                    count += 1
+                social_links[f"{platform}_{count}"] = link
+
+    # Cari juga di tag meta dan link
+    for content in meta_contents:
+        # Every social pattern needs a scheme, so most values are rejected without a regex
+        if '://' not in content:
+            continue
+        found = find_social_matches(content)
+        for platform in SOCIAL_PATTERNS:
+            if platform in found and platform not in social_links:
+                social_links[platform] = found[platform][0]
+
+    for href in hrefs:
+        if '://' not in href:
+            continue
+        found = find_social_matches(href)
+        for platform in SOCIAL_PATTERNS:
+            if platform in found and platform not in social_links:
+                social_links[platform] = href
+
+    return social_links
+
+def extract_contacts(text, links):
+    """Extract (emails, phones, social_links) from decoded page text and its ParsedLinks"""
+    emails = extract_emails(text)
+    phones = extract_phones(text, links.hrefs)
+    social_links = extract_social_links(text, links.meta_contents, links.hrefs)
+    return emails, phones, social_links
@@ -1,9 +1,12 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 from datetime import datetime
-import json
-import os
 import logging
+import threading
+
+import history_store
+from metrics import stage
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -12,36 +15,150 @@ logger = logging.getLogger(__name__)
 HISTORY_FILE = "scraping_history.json"
 
 def init_history():
-    """Initialize the scraping history file if it doesn't exist"""
+    """Initialize the history store, importing scraping_history.json on first run"""
     try:
-        if not os.path.exists(HISTORY_FILE):
-            with open(HISTORY_FILE, 'w', encoding='utf-8') as f:
-                json.dump([], f, ensure_ascii=False, indent=2)
-            logger.info(f"Created new history file: {HISTORY_FILE}")
-        else:
-            logger.info(f"History file already exists: {HISTORY_FILE}")
+        history_store.init_store(json_path=HISTORY_FILE)
     except Exception as e:
-        logger.error(f"Error initializing history file: {str(e)}")
-        st.error(f"Error initializing history file: {str(e)}")
+        logger.error(f"Error initializing history store: {str(e)}")
+        st.error(f"Error initializing history store: {str(e)}")
+
+# Process-wide history cache shared by every Streamlit session, keyed on the store version
+_history_cache = {'version': None, 'records': []}
+_history_cache_stats = {'hits': 0, 'misses': 0}
+_history_cache_lock = threading.Lock()
 
 def get_history():
-    """Retrieve scraping history from scraping_history.json"""
+    """
+    Retrieve scraping history from the history store.
+
+    Records are only re-read when the store version changes, so widget reruns
+    reuse the cached list. The list is shared between sessions: treat it as read-only.
+    """
     init_history()
     try:
-        with open(HISTORY_FILE, 'r', encoding='utf-8') as f:
-            history_data = json.load(f)
-            logger.info(f"Loaded {len(history_data)} records from history file")
-            return history_data
-    except json.JSONDecodeError:
-        logger.warning("History file contains invalid JSON, returning empty list")
-        return []
+        version = history_store.get_version()
+        with _history_cache_lock:
+            if _history_cache['version'] == version:
+                _history_cache_stats['hits'] += 1
+                return _history_cache['records']
+
+        history_data = history_store.get_records()
+        with _history_cache_lock:
+            _history_cache['version'] = version
+            _history_cache['records'] = history_data
+            _history_cache_stats['misses'] += 1
+        logger.info(f"Loaded {len(history_data)} records from history store (version {version})")
+        return history_data
     except Exception as e:
-        logger.error(f"Error reading history file: {str(e)}")
+        logger.error(f"Error reading history store: {str(e)}")
         st.error(f"Error reading history data: {str(e)}")
         return []
 
+def get_history_cache_stats():
+    """Hit/miss counters and current version of the shared history cache"""
+    with _history_cache_lock:
+        return dict(_history_cache_stats, version=_history_cache['version'])
+
+SCRAPED_TABLE_COLUMNS = ['Website', 'Date', 'Type', 'Value', 'URL', 'Source', 'Scrape ID']
+
+_scraped_table_cache = {'version': None, 'df': None}
+
+_format_date = history_store.format_date
+
+def _format_dates(timestamps):
+    """Vectorized ISO timestamp -> 'YYYY-MM-DD HH:MM', 'Unknown' when missing or invalid"""
+    try:
+        parsed = pd.to_datetime(timestamps, errors='coerce', format='ISO8601')
+        if parsed.dt.tz is not None:
+            # One shared offset: keep the wall time written in the timestamp, as format_date does
+            parsed = parsed.dt.tz_localize(None)
+        formatted = np.datetime_as_string(parsed.to_numpy(dtype='datetime64[ns]'), unit='m')
+    except (ValueError, TypeError):
+        # Mixed timezone offsets cannot share one datetime64 column
+        return timestamps.map(_format_date)
+    formatted = pd.Series(np.char.replace(formatted, 'T', ' '), index=timestamps.index, dtype=object)
+    return formatted.where(parsed.notna(), 'Unknown')
+
+def flatten_history(history):
+    """
+    Flatten history records into the long-format dashboard table: one row per
+    email, phone, social link and pricing row.
+
+    Each record is visited once to gather flat value/type columns plus a per-row
+    record index; record-level columns are then expanded with one numpy take
+    instead of building a dict per row. Website/Type/Source are categorical.
+    """
+    websites, timestamps, urls, sources, scrape_ids = [], [], [], [], []
+    row_records, types, values = [], [], []
+
+    for record_no, item in enumerate(history):
+        website = item.get('website', 'Unknown')
+        websites.append(website)
+        timestamps.append(item.get('timestamp') or None)
+        urls.append(item.get('url', website))
+        sources.append(item.get('scraper_type', 'universal'))
+        scrape_ids.append(item.get('id', 'N/A'))
+
+        emails = item.get('emails', [])
+        phones = item.get('phones', [])
+        social_links = item.get('social_links', {})
+        pricing = [", ".join([f"{k}: {v}" for k, v in pricing_item.items()])
+                   for pricing_item in item.get('pricing_data', []) if isinstance(pricing_item, dict)]
+
+        # Same row order as before: emails, phones, social links, pricing rows
+        values.extend(emails)
+        values.extend(phones)
+        values.extend(social_links.values())
+        values.extend(pricing)
+        types.extend(['Email'] * len(emails))
+        types.extend(['Phone'] * len(phones))
+        types.extend([f"Social ({platform})" for platform in social_links])
+        types.extend(['Pricing Plan'] * len(pricing))
+        row_records.extend([record_no] * (len(emails) + len(phones) + len(social_links) + len(pricing)))
+
+    if not values:
+        return pd.DataFrame(columns=SCRAPED_TABLE_COLUMNS)
+
+    rows = np.array(row_records, dtype=np.int64)
+    dates = _format_dates(pd.Series(timestamps, dtype=object)).to_numpy()
+    return pd.DataFrame({
+        'Website': pd.Categorical(np.array(websites, dtype=object)[rows]),
+        'Date': dates[rows],
+        'Type': pd.Categorical(types),
+        'Value': values,
+        'URL': np.array(urls, dtype=object)[rows],
+        'Source': pd.Categorical(np.array(sources, dtype=object)[rows]),
+        'Scrape ID': np.array(scrape_ids, dtype=object)[rows],
+    }, columns=SCRAPED_TABLE_COLUMNS)
+
+def get_scraped_table():
+    """Long-format history table for the current store version, flattened once per version"""
+    history = get_history()
+    with _history_cache_lock:
+        version = _history_cache['version']
+        if _scraped_table_cache['version'] == version and _scraped_table_cache['df'] is not None:
+            return _scraped_table_cache['df']
+
+    flat = flatten_history(history)
+    with _history_cache_lock:
+        _scraped_table_cache['version'] = version
+        _scraped_table_cache['df'] = flat
+    return flat
+
+SESSION_PAGE_SIZE = 100
+DETAIL_PAGE_SIZE = 20
+
+def _paged(items, key):
+    """Show one page of a long list inside a session expander, with a page picker when needed"""
+    if len(items) <= DETAIL_PAGE_SIZE:
+        return items
+    page_count = -(-len(items) // DETAIL_PAGE_SIZE)
+    page = st.number_input(f"Page (of {page_count})", min_value=1, max_value=page_count, value=1, key=key)
+    start = (page - 1) * DETAIL_PAGE_SIZE
+    return items[start:start + DETAIL_PAGE_SIZE]
+
 def show_dashboard():
-    """Show dashboard with scraped website data from scraping_history.json"""
+    """Show dashboard with scraped website data from the history store"""
     st.title("📊 Analytics Dashboard")
     
     # Security notice - no delete functionality
@@ -49,110 +166,42 @@ def show_dashboard():
     
     st.divider()
     
-    history = get_history()
+    init_history()
+    type_counts = history_store.item_type_counts()
+    total_scrapes = history_store.count_records()
     
     # Metrics Row - Horizontal
     st.subheader("📈 Performance Metrics")
     col1, col2, col3, col4, col5 = st.columns(5)
     
     with col1:
-        st.metric("Total Scrapes", str(len(history)))
+        st.metric("Total Scrapes", str(total_scrapes))
     with col2:
-        total_emails = sum(len(item.get('emails', [])) for item in history)
-        st.metric("Total Emails", str(total_emails))
+        st.metric("Total Emails", str(type_counts.get('Email', 0)))
     with col3:
-        total_phones = sum(len(item.get('phones', [])) for item in history)
-        st.metric("Total Phones", str(total_phones))
+        st.metric("Total Phones", str(type_counts.get('Phone', 0)))
     with col4:
-        total_social = sum(len(item.get('social_links', {})) for item in history)
+        total_social = sum(count for item_type, count in type_counts.items() if item_type.startswith('Social ('))
         st.metric("Social Links", str(total_social))
     with col5:
-        total_pricing = sum(len(item.get('pricing_data', [])) for item in history)
-        st.metric("Pricing Plans", str(total_pricing))
+        st.metric("Pricing Plans", str(type_counts.get('Pricing Plan', 0)))
     
     st.divider()
     
     # Scraped Website Data Table with Filters
     st.subheader("🌐 Scraped Website Data")
     
-    if history:
-        # Create a list to store all scraped data
-        all_scraped_data = []
-        
-        for item in history:
-            website = item.get('website', 'Unknown')
-            timestamp = item.get('timestamp', '')
-            
-            # Handle timestamp conversion safely
-            try:
-                date = datetime.fromisoformat(timestamp).strftime('%Y-%m-%d %H:%M') if timestamp else 'Unknown'
-            except (ValueError, TypeError):
-                date = 'Unknown'
-                
-            scraper_type = item.get('scraper_type', 'universal')
-            
-            # Add emails
-            for email in item.get('emails', []):
-                all_scraped_data.append({
-                    'Website': website,
-                    'Date': date,
-                    'Type': 'Email',
-                    'Value': email,
-                    'URL': item.get('url', website),
-                    'Source': scraper_type,
-                    'Scrape ID': item.get('id', 'N/A')
-                })
-            
-            # Add phones
-            for phone in item.get('phones', []):
-                all_scraped_data.append({
-                    'Website': website,
-                    'Date': date,
-                    'Type': 'Phone',
-                    'Value': phone,
-                    'URL': item.get('url', website),
-                    'Source': scraper_type,
-                    'Scrape ID': item.get('id', 'N/A')
-                })
-            
-            # Add social links
-            for platform, link in item.get('social_links', {}).items():
-                all_scraped_data.append({
-                    'Website': website,
-                    'Date': date,
-                    'Type': f'Social ({platform})',
-                    'Value': link,
-                    'URL': item.get('url', website),
-                    'Source': scraper_type,
-                    'Scrape ID': item.get('id', 'N/A')
-                })
-            
-            # Add pricing data (from competitive analysis)
-            for pricing_item in item.get('pricing_data', []):
-                if isinstance(pricing_item, dict):
-                    # Convert dict to readable string
-                    pricing_str = ", ".join([f"{k}: {v}" for k, v in pricing_item.items()])
-                    all_scraped_data.append({
-                        'Website': website,
-                        'Date': date,
-                        'Type': 'Pricing Plan',
-                        'Value': pricing_str,
-                        'URL': item.get('url', website),
-                        'Source': scraper_type,
-                        'Scrape ID': item.get('id', 'N/A')
-                    })
+    if total_scrapes:
+        total_items = sum(type_counts.values())
         
-        if all_scraped_data:
-            # Create DataFrame
-            scraped_df = pd.DataFrame(all_scraped_data)
-            
+        if total_items:
             # Filter Section - Horizontal Layout
             st.subheader("🔍 Filter Data")
             filter_col1, filter_col2, filter_col3, filter_col4 = st.columns(4)
             
             with filter_col1:
                 # Website filter dropdown
-                websites = sorted(scraped_df['Website'].unique())
+                websites = history_store.distinct_item_values('website')
                 selected_websites = st.multiselect(
                     "Filter by Website",
                     options=websites,
@@ -162,7 +211,7 @@ def show_dashboard():
             
             with filter_col2:
                 # Data type filter dropdown
-                data_types = sorted(scraped_df['Type'].unique())
+                data_types = history_store.distinct_item_values('type')
                 selected_types = st.multiselect(
                     "Filter by Data Type",
                     options=data_types,
@@ -172,7 +221,7 @@ def show_dashboard():
             
             with filter_col3:
                 # Source filter dropdown
-                sources = sorted(scraped_df['Source'].unique())
+                sources = history_store.distinct_item_values('source')
                 selected_sources = st.multiselect(
                     "Filter by Source",
                     options=sources,
@@ -188,26 +237,33 @@ def show_dashboard():
                     help="Search within the extracted values"
                 )
             
-            # Apply filters
+            # Filters are pushed down into the store query; a filter that selects
+            # everything is dropped so the query can skip it entirely
+            filters = {'search': search_term or None}
             if selected_websites and selected_types and selected_sources:
-                filtered_df = scraped_df[
-                    (scraped_df['Website'].isin(selected_websites)) &
-                    (scraped_df['Type'].isin(selected_types)) &
-                    (scraped_df['Source'].isin(selected_sources))
-                ]
-            else:
-                filtered_df = scraped_df
+                filters['websites'] = None if len(selected_websites) == len(websites) else selected_websites
+                filters['types'] = None if len(selected_types) == len(data_types) else selected_types
+                filters['sources'] = None if len(selected_sources) == len(sources) else selected_sources
+            
+            filtered_total = history_store.count_items(**filters)
             
-            # Apply search filter if provided
-            if search_term:
-                filtered_df = filtered_df[filtered_df['Value'].str.contains(search_term, case=False, na=False)]
+            # Pagination
+            page_col, size_col = st.columns([3, 1])
+            with size_col:
+                page_size = st.selectbox("Rows per page", options=[25, 50, 100, 250], index=1)
+            page_count = max(1, -(-filtered_total // page_size))
+            with page_col:
+                page_number = st.number_input(f"Page (of {page_count})", min_value=1, max_value=page_count, value=1)
+            
+            page_rows = history_store.query_items(limit=page_size, offset=(page_number - 1) * page_size, **filters)
+            page_df = pd.DataFrame(page_rows, columns=SCRAPED_TABLE_COLUMNS)
             
             # Display stats
-            st.info(f"📊 Showing {len(filtered_df)} of {len(scraped_df)} total records")
+            st.info(f"📊 Showing {len(page_df)} of {filtered_total} matching records ({total_items} total)")
             
             # Display the table
             st.dataframe(
-                filtered_df,
+                page_df,
                 use_container_width=True,
                 hide_index=True,
                 column_config={
@@ -217,30 +273,32 @@ def show_dashboard():
                 }
             )
             
-            # Download buttons - Horizontal
+            # Download buttons - Horizontal; the CSV is only built when asked for
             dl_col1, dl_col2 = st.columns(2)
             
             with dl_col1:
                 # Download filtered data
-                csv_filtered = filtered_df.to_csv(index=False)
-                st.download_button(
-                    label="📥 Download Filtered Data as CSV",
-                    data=csv_filtered,
-                    file_name="filtered_scraped_data.csv",
-                    mime="text/csv",
-                    use_container_width=True
-                )
+                if st.button("📄 Prepare Filtered CSV", use_container_width=True):
+                    filtered_df = pd.DataFrame(history_store.query_items(limit=None, **filters), columns=SCRAPED_TABLE_COLUMNS)
+                    st.download_button(
+                        label="📥 Download Filtered Data as CSV",
+                        data=filtered_df.to_csv(index=False),
+                        file_name="filtered_scraped_data.csv",
+                        mime="text/csv",
+                        use_container_width=True
+                    )
             
             with dl_col2:
-                # Download all data
-                csv_all = scraped_df.to_csv(index=False)
-                st.download_button(
-                    label="📥 Download All Data as CSV",
-                    data=csv_all,
-                    file_name="all_scraped_data.csv",
-                    mime="text/csv",
-                    use_container_width=True
-                )
+                # Download all data: the same history_items rows as the table, unfiltered
+                if st.button("📄 Prepare Full CSV", use_container_width=True):
+                    full_df = pd.DataFrame(history_store.query_items(limit=None), columns=SCRAPED_TABLE_COLUMNS)
+                    st.download_button(
+                        label="📥 Download All Data as CSV",
+                        data=full_df.to_csv(index=False),
+                        file_name="all_scraped_data.csv",
+                        mime="text/csv",
+                        use_container_width=True
+                    )
         else:
             st.info("No detailed scraped data available yet")
     else:
@@ -250,20 +308,19 @@ def show_dashboard():
     
     # Recent Activity with detailed view
     st.subheader("📋 Scraping Sessions")
-    if history:
+    if total_scrapes:
+        # Sessions are listed one page at a time straight from the store
+        session_page_count = max(1, -(-total_scrapes // SESSION_PAGE_SIZE))
+        session_page = st.number_input(
+            f"Session page (of {session_page_count})", min_value=1, max_value=session_page_count, value=1
+        )
+        sessions = history_store.list_sessions(SESSION_PAGE_SIZE, (session_page - 1) * SESSION_PAGE_SIZE)
+        
         # Session selection dropdown
-        session_options = {}
-        for item in history:
-            website = item.get('website', 'Unknown')
-            timestamp = item.get('timestamp', '')
-            
-            # Handle timestamp conversion safely
-            try:
-                date_str = datetime.fromisoformat(timestamp).strftime('%Y-%m-%d %H:%M') if timestamp else 'Unknown'
-            except (ValueError, TypeError):
-                date_str = 'Unknown'
-                
-            session_options[item['id']] = f"ID {item['id']} - {website} - {date_str}"
+        session_options = {
+            session_id: f"ID {session_id} - {website or 'Unknown'} - {history_store.format_date(timestamp)}"
+            for session_id, website, timestamp in sessions
+        }
         
         selected_session_id = st.selectbox(
             "Select a scraping session to view details:",
@@ -272,7 +329,7 @@ def show_dashboard():
         )
         
         # Display selected session details
-        selected_session = next((item for item in history if item['id'] == selected_session_id), None)
+        selected_session = history_store.get_record(selected_session_id) if selected_session_id is not None else None
         
         if selected_session:
             session_col1, session_col2 = st.columns([1, 2])
@@ -281,15 +338,7 @@ def show_dashboard():
                 st.write("**Session Overview**")
                 st.write(f"**Website:** {selected_session.get('website', 'Unknown')}")
                 st.write(f"**URL:** {selected_session.get('url', 'N/A')}")
-                
-                # Handle timestamp conversion safely
-                try:
-                    timestamp = selected_session.get('timestamp', '')
-                    date_str = datetime.fromisoformat(timestamp).strftime('%Y-%m-%d %H:%M') if timestamp else 'Unknown'
-                except (ValueError, TypeError):
-                    date_str = 'Unknown'
-                    
-                st.write(f"**Date:** {date_str}")
+                st.write(f"**Date:** {history_store.format_date(selected_session.get('timestamp', ''))}")
                 st.write(f"**Scraper Type:** {selected_session.get('scraper_type', 'universal').replace('_', ' ').title()}")
                 st.write(f"**Session ID:** {selected_session.get('id', 'N/A')}")
             
@@ -316,19 +365,20 @@ def show_dashboard():
             # Emails
             if selected_session.get('emails'):
                 with st.expander(f"📧 Emails ({len(selected_session['emails'])})"):
-                    for email in selected_session['emails']:
+                    for email in _paged(selected_session['emails'], f"emails_{selected_session_id}"):
                         st.code(email)
             
             # Phone numbers
             if selected_session.get('phones'):
                 with st.expander(f"📞 Phone Numbers ({len(selected_session['phones'])})"):
-                    for phone in selected_session['phones']:
+                    for phone in _paged(selected_session['phones'], f"phones_{selected_session_id}"):
                         st.code(phone)
             
             # Social links
             if selected_session.get('social_links'):
                 with st.expander(f"📱 Social Links ({len(selected_session['social_links'])})"):
-                    for platform, link in selected_session['social_links'].items():
+                    social_items = list(selected_session['social_links'].items())
+                    for platform, link in _paged(social_items, f"social_{selected_session_id}"):
                         st.write(f"**{platform.upper()}**: {link}")
             
             # Pricing data
@@ -342,22 +392,27 @@ def show_dashboard():
                             st.write(f"**Item {i+1}:** {str(item)}")
     else:
         st.info("No scraping history yet")
+    
+    # Debug area
+    with st.expander("🛠 Debug"):
+        cache_stats = get_history_cache_stats()
+        debug_col1, debug_col2, debug_col3 = st.columns(3)
+        with debug_col1:
+            st.metric("History Cache Hits", cache_stats['hits'])
+        with debug_col2:
+            st.metric("History Cache Misses", cache_stats['misses'])
+        with debug_col3:
+            st.metric("Store Version", str(cache_stats['version']))
 
 def add_to_history(scraping_data):
     """Add new scraping data to history"""
     try:
-        history = get_history()
+        init_history()
         
-        # Add timestamp and ID
+        # Add timestamp; the ID is assigned by the store so concurrent writers never collide
         scraping_data['timestamp'] = datetime.now().isoformat()
-        scraping_data['id'] = len(history) + 1
-        
-        # Add to history
-        history.append(scraping_data)
-        
-        # Save back to file
-        with open(HISTORY_FILE, 'w', encoding='utf-8') as f:
-            json.dump(history, f, indent=2, ensure_ascii=False)
+        with stage('history_write'):
+            scraping_data['id'] = history_store.add_record(scraping_data)
         
         logger.info(f"Added new scraping data to history with ID: {scraping_data['id']}")
         return scraping_data['id']
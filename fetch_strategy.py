@@ -0,0 +1,215 @@
+# fetch_strategy.py
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from urllib.parse import urlparse
+
+from browser_pool import PLAYWRIGHT_AVAILABLE, get_browser_pool
+from html_document import HtmlDocument
+from http_session import SkippedContent
+from render_profile import get_render_profile
+from scheduler import request_timeout
+from settings import get_setting
+
+logger = logging.getLogger(__name__)
+
+STATIC = 'static'
+BROWSER = 'browser'
+# The page's own JSON data endpoint, requested directly (see scraper.scrape_pricing)
+API = 'api'
+
+DEFAULT_MIN_TEXT_CHARS = 500
+# Statuses sites commonly send to non-browser clients; worth one render before giving up
+BOT_BLOCK_STATUSES = frozenset({403})
+
+# Evaluated in the page while waiting for client-side rendering to produce contact data
+CONTACT_READY_JS = '''minChars => !!document.querySelector('a[href^="mailto:"]')
+    || (!!document.body && document.body.innerText.replace(/\\s+/g, '').length >= minChars)'''
+
+def get_min_text_chars():
+    """Visible characters below which a page without a mailto link counts as not rendered yet"""
+    return get_setting('fetch_settings', 'min_text_chars', DEFAULT_MIN_TEXT_CHARS, int)
+
+def browser_fallback_enabled():
+    """True when escalation to the headless browser is both configured and possible"""
+    return PLAYWRIGHT_AVAILABLE and get_setting('fetch_settings', 'browser_fallback', True, bool)
+
+def _strategy_key(url):
+    host = (urlparse(url).hostname or '').lower()
+    return host[4:] if host.startswith('www.') else host
+
+class StrategyMemory:
+    """
+    Winning fetch strategy per domain, kept in SQLite so later runs start with
+    it. Reads come from an in-memory copy; each change writes only its own row.
+    """
+
+    def __init__(self, path, json_path=None):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('''
+            CREATE TABLE IF NOT EXISTS strategies (
+                domain TEXT PRIMARY KEY,
+                strategy TEXT NOT NULL,
+                updated REAL NOT NULL,
+                details TEXT
+            )
+        ''')
+        self._db.commit()
+        if json_path:
+            self._import_json(json_path)
+        self._strategies = {
+            domain: {'strategy': strategy, 'updated': updated, **json.loads(details or '{}')}
+            for domain, strategy, updated, details in self._db.execute(
+                'SELECT domain, strategy, updated, details FROM strategies')
+        }
+
+    def _import_json(self, json_path):
+        """Take over fetch_strategies.json from before the SQLite table, once"""
+        if self._db.execute('SELECT 1 FROM strategies LIMIT 1').fetchone() or not os.path.exists(json_path):
+            return
+        try:
+            with open(json_path, 'r', encoding='utf-8') as f:
+                strategies = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            logger.warning(f"{json_path} could not be read, starting with an empty strategy memory")
+            return
+        self._db.executemany(
+            'INSERT OR IGNORE INTO strategies (domain, strategy, updated, details) VALUES (?, ?, ?, ?)',
+            [(domain, entry['strategy'], entry.get('updated', 0),
+              json.dumps({k: v for k, v in entry.items() if k not in ('strategy', 'updated')}))
+             for domain, entry in strategies.items() if isinstance(entry, dict) and entry.get('strategy')]
+        )
+        self._db.commit()
+
+    def strategy_for(self, url):
+        entry = self._strategies.get(_strategy_key(url))
+        return entry['strategy'] if entry else None
+
+    def details_for(self, url):
+        """Extra fields remembered with the strategy (e.g. a data endpoint); {} if none"""
+        return dict(self._strategies.get(_strategy_key(url)) or {})
+
+    def remember(self, url, strategy, **details):
+        key = _strategy_key(url)
+        with self._lock:
+            entry = self._strategies.get(key)
+            if entry and entry['strategy'] == strategy and all(entry.get(k) == v for k, v in details.items()):
+                return
+            updated = time.time()
+            self._strategies[key] = {'strategy': strategy, 'updated': updated, **details}
+            self._db.execute(
+                'INSERT OR REPLACE INTO strategies (domain, strategy, updated, details) VALUES (?, ?, ?, ?)',
+                (key, strategy, updated, json.dumps(details))
+            )
+            self._db.commit()
+
+_memory = None
+_memory_lock = threading.Lock()
+
+def get_strategy_memory():
+    global _memory
+    if _memory is None:
+        with _memory_lock:
+            if _memory is None:
+                output_directory = get_setting('output_settings', 'output_directory', './data/')
+                _memory = StrategyMemory(os.path.join(output_directory, 'fetch_strategies.sqlite'),
+                                         json_path=os.path.join(output_directory, 'fetch_strategies.json'))
+    return _memory
+
+def _is_bot_block(error):
+    """An HTTP error status that usually means the static client was refused, not that the page is gone"""
+    response = getattr(error, 'response', None)
+    return getattr(response, 'status_code', None) in BOT_BLOCK_STATUSES
+
+def fetch_tiered(url, static_fetch, browser_fetch, is_sufficient, memory=None):
+    """
+    Fetch with the cheapest strategy that yields the target data; returns (result, strategy).
+
+    static_fetch(url) runs first unless this domain is remembered as needing
+    the browser. browser_fetch(url) is only tried when the static result
+    fails is_sufficient(result) or the server refused the static client
+    (BOT_BLOCK_STATUSES); DNS errors, refused connections and other HTTP
+    errors are raised as they are. The strategy that produced the data is
+    remembered per domain. browser_fetch may be None when no browser is
+    available, in which case the static result is returned as-is.
+    """
+    memory = memory or get_strategy_memory()
+
+    browser_failed = False
+    if browser_fetch is not None and memory.strategy_for(url) == BROWSER:
+        try:
+            return browser_fetch(url), BROWSER
+        except Exception as e:
+            # Browser broke for a domain that needed it: the static result is better than nothing
+            logger.warning(f"Browser fetch failed for {url}, trying static: {str(e)}")
+            browser_failed = True
+
+    static_result, static_error = None, None
+    try:
+        static_result = static_fetch(url)
+        if is_sufficient(static_result):
+            memory.remember(url, STATIC)
+            return static_result, STATIC
+    except SkippedContent:
+        # Not a page at all (a PDF, a video): rendering it would not help
+        raise
+    except Exception as e:
+        if not _is_bot_block(e):
+            # The site is down or the page does not exist; a render would not change that
+            raise
+        static_error = e
+
+    if browser_fetch is None or browser_failed:
+        if static_error is not None:
+            raise static_error
+        return static_result, STATIC
+
+    try:
+        browser_result = browser_fetch(url)
+    except Exception as e:
+        logger.warning(f"Browser fetch failed for {url}: {str(e)}")
+        if static_error is not None:
+            # The static failure says what is actually wrong with the site
+            raise static_error
+        return static_result, STATIC
+
+    if is_sufficient(browser_result):
+        memory.remember(url, BROWSER)
+    return browser_result, BROWSER
+
+async def _render_html(page, url, profile, wait_selector, min_text_chars, timeout_ms):
+    await profile.apply(page, url)
+    await page.goto(url, timeout=timeout_ms, wait_until=profile.wait_until)
+    try:
+        if wait_selector:
+            await page.wait_for_selector(wait_selector, state='attached', timeout=timeout_ms)
+        else:
+            await page.wait_for_function(CONTACT_READY_JS, arg=min_text_chars, timeout=timeout_ms)
+    except Exception:
+        # Nothing showed up in time; hand back whatever did render
+        pass
+    return page.url, await page.content()
+
+def render_document(url, pool=None, wait_selector=None, min_text_chars=None, timeout=None, profile=None):
+    """
+    Render a page in the shared headless browser and return it as an HtmlDocument.
+
+    Waits for wait_selector when given, otherwise until a mailto link or
+    min_text_chars of visible text appears (both bounded by timeout seconds,
+    request_timeout from config.ini by default).
+    """
+    pool = pool or get_browser_pool()
+    if timeout is None:
+        timeout = request_timeout()
+    profile = profile or get_render_profile()
+    if min_text_chars is None:
+        min_text_chars = get_min_text_chars()
+    final_url, html = pool.run(_render_html, url, profile, wait_selector, min_text_chars, int(timeout * 1000))
+    return HtmlDocument(final_url, html.encode('utf-8'), 'text/html; charset=utf-8')
@@ -0,0 +1,284 @@
+# history_store.py
+import json
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+HISTORY_DB = "scraping_history.db"
+# Legacy history file, imported once into the database
+HISTORY_JSON = "scraping_history.json"
+
+_local = threading.local()
+_init_lock = threading.Lock()
+_initialized = set()
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    website TEXT,
+    url TEXT,
+    scraper_type TEXT,
+    timestamp TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_history_website ON history(website);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+-- Long-format rows behind the dashboard table (one per email, phone, social link, pricing row)
+CREATE TABLE IF NOT EXISTS history_items (
+    history_id INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    website TEXT,
+    date TEXT,
+    type TEXT,
+    value TEXT,
+    url TEXT,
+    source TEXT,
+    PRIMARY KEY (history_id, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_items_website ON history_items(website);
+CREATE INDEX IF NOT EXISTS idx_items_type ON history_items(type);
+CREATE INDEX IF NOT EXISTS idx_items_source ON history_items(source);
+'''
+
+# Dashboard column name -> history_items column
+ITEM_COLUMNS = {
+    'Website': 'website',
+    'Date': 'date',
+    'Type': 'type',
+    'Value': 'value',
+    'URL': 'url',
+    'Source': 'source',
+    'Scrape ID': 'history_id',
+}
+
+def format_date(timestamp):
+    """ISO timestamp -> 'YYYY-MM-DD HH:MM', 'Unknown' when missing or invalid"""
+    # Handle timestamp conversion safely
+    try:
+        return datetime.fromisoformat(timestamp).strftime('%Y-%m-%d %H:%M') if timestamp else 'Unknown'
+    except (ValueError, TypeError):
+        return 'Unknown'
+
+def record_items(record_id, record):
+    """Long-format rows for one record, in dashboard order: emails, phones, social links, pricing"""
+    website = record.get('website', 'Unknown')
+    date = format_date(record.get('timestamp', ''))
+    url = record.get('url', website)
+    source = record.get('scraper_type', 'universal')
+
+    typed_values = [('Email', email) for email in record.get('emails', [])]
+    typed_values += [('Phone', phone) for phone in record.get('phones', [])]
+    typed_values += [(f"Social ({platform})", link) for platform, link in record.get('social_links', {}).items()]
+    typed_values += [
+        ('Pricing Plan', ", ".join([f"{k}: {v}" for k, v in pricing_item.items()]))
+        for pricing_item in record.get('pricing_data', []) if isinstance(pricing_item, dict)
+    ]
+    return [
+        (record_id, position, website, date, item_type, str(value), url, source)
+        for position, (item_type, value) in enumerate(typed_values)
+    ]
+
+def _insert_items(conn, record_id, record):
+    conn.executemany(
+        'INSERT OR REPLACE INTO history_items (history_id, position, website, date, type, value, url, source) '
+        'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+        record_items(record_id, record)
+    )
+
+def _connect(db_path):
+    # isolation_level=None: transactions are opened explicitly with BEGIN IMMEDIATE
+    conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    return conn
+
+def get_connection(db_path=HISTORY_DB):
+    """One connection per thread (Streamlit runs each session in its own thread)"""
+    connections = getattr(_local, 'connections', None)
+    if connections is None:
+        connections = _local.connections = {}
+    if db_path not in connections:
+        connections[db_path] = _connect(db_path)
+    init_store(db_path)
+    return connections[db_path]
+
+def init_store(db_path=HISTORY_DB, json_path=HISTORY_JSON):
+    """Create the schema and import the legacy JSON history once"""
+    if db_path in _initialized:
+        return
+    with _init_lock:
+        if db_path in _initialized:
+            return
+        conn = _connect(db_path)
+        try:
+            conn.executescript(SCHEMA)
+            _migrate_json(conn, json_path)
+            _backfill_items(conn)
+        finally:
+            conn.close()
+        _initialized.add(db_path)
+
+def _migrate_json(conn, json_path):
+    """Import scraping_history.json keeping its ids; guarded so it runs exactly once"""
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        if conn.execute("SELECT 1 FROM meta WHERE key = 'json_migrated'").fetchone():
+            conn.execute('COMMIT')
+            return
+
+        records = []
+        if os.path.exists(json_path):
+            try:
+                with open(json_path, 'r', encoding='utf-8') as f:
+                    records = json.load(f)
+            except json.JSONDecodeError:
+                logger.warning(f"{json_path} contains invalid JSON, skipping migration")
+
+        # Records keep their ids; old concurrent writers could produce duplicate or
+        # missing ids, and those records are appended afterwards with fresh ones
+        seen_ids = set()
+        keep_id, fresh_id = [], []
+        for record in records:
+            record = dict(record)
+            record_id = record.pop('id', None)
+            if isinstance(record_id, int) and record_id not in seen_ids:
+                seen_ids.add(record_id)
+                keep_id.append((record_id, record))
+            else:
+                fresh_id.append((None, record))
+
+        for record_id, record in keep_id + fresh_id:
+            conn.execute(
+                'INSERT INTO history (id, website, url, scraper_type, timestamp, data) VALUES (?, ?, ?, ?, ?, ?)',
+                (record_id, record.get('website'), record.get('url'), record.get('scraper_type'),
+                 record.get('timestamp'), json.dumps(record, ensure_ascii=False))
+            )
+
+        conn.execute("INSERT INTO meta (key, value) VALUES ('json_migrated', ?)", (str(len(records)),))
+        conn.execute('COMMIT')
+        if records:
+            logger.info(f"Migrated {len(records)} records from {json_path} to {HISTORY_DB}")
+    except Exception:
+        conn.execute('ROLLBACK')
+        raise
+
+def _backfill_items(conn):
+    """Build history_items for records written before the table existed; runs once"""
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        if conn.execute("SELECT 1 FROM meta WHERE key = 'items_backfilled'").fetchone():
+            conn.execute('COMMIT')
+            return
+        for record_id, data in conn.execute('SELECT id, data FROM history ORDER BY id').fetchall():
+            _insert_items(conn, record_id, json.loads(data))
+        conn.execute("INSERT INTO meta (key, value) VALUES ('items_backfilled', '1')")
+        conn.execute('COMMIT')
+    except Exception:
+        conn.execute('ROLLBACK')
+        raise
+
+def _row_to_record(row):
+    record_id, data = row
+    record = json.loads(data)
+    record['id'] = record_id
+    return record
+
+def add_record(record, db_path=HISTORY_DB):
+    """Append one record in O(1) and return the id assigned by the store"""
+    data = {k: v for k, v in record.items() if k != 'id'}
+    conn = get_connection(db_path)
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        cursor = conn.execute(
+            'INSERT INTO history (website, url, scraper_type, timestamp, data) VALUES (?, ?, ?, ?, ?)',
+            (data.get('website'), data.get('url'), data.get('scraper_type'), data.get('timestamp'),
+             json.dumps(data, ensure_ascii=False))
+        )
+        record_id = cursor.lastrowid
+        _insert_items(conn, record_id, data)
+        conn.execute('COMMIT')
+    except Exception:
+        conn.execute('ROLLBACK')
+        raise
+    return record_id
+
+def get_records(db_path=HISTORY_DB):
+    """All records, oldest first, in the same shape as the old JSON history"""
+    rows = get_connection(db_path).execute('SELECT id, data FROM history ORDER BY id').fetchall()
+    return [_row_to_record(row) for row in rows]
+
+def get_record(record_id, db_path=HISTORY_DB):
+    row = get_connection(db_path).execute('SELECT id, data FROM history WHERE id = ?', (record_id,)).fetchone()
+    return _row_to_record(row) if row else None
+
+def get_records_by_website(website, db_path=HISTORY_DB):
+    rows = get_connection(db_path).execute(
+        'SELECT id, data FROM history WHERE website = ? ORDER BY id', (website,)
+    ).fetchall()
+    return [_row_to_record(row) for row in rows]
+
+def get_version(db_path=HISTORY_DB):
+    """
+    Store version counter: the AUTOINCREMENT sequence, bumped by every append.
+    History is append-only, so an unchanged version means unchanged records.
+    """
+    row = get_connection(db_path).execute("SELECT seq FROM sqlite_sequence WHERE name = 'history'").fetchone()
+    return row[0] if row else 0
+
+def count_records(db_path=HISTORY_DB):
+    return get_connection(db_path).execute('SELECT COUNT(*) FROM history').fetchone()[0]
+
+def list_sessions(limit, offset=0, db_path=HISTORY_DB):
+    """One page of (id, website, timestamp) without decoding the stored records"""
+    return get_connection(db_path).execute(
+        'SELECT id, website, timestamp FROM history ORDER BY id LIMIT ? OFFSET ?', (limit, offset)
+    ).fetchall()
+
+def _item_filters(websites=None, types=None, sources=None, search=None):
+    """WHERE clause and parameters for dashboard filters; None means 'no filter'"""
+    clauses, params = [], []
+    for column, selected in (('website', websites), ('type', types), ('source', sources)):
+        if selected is not None:
+            clauses.append(f"{column} IN ({', '.join('?' * len(selected))})")
+            params.extend(selected)
+    if search:
+        escaped = search.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        clauses.append("value LIKE ? ESCAPE '\\'")
+        params.append(f"%{escaped}%")
+    return (' WHERE ' + ' AND '.join(clauses)) if clauses else '', params
+
+def query_items(websites=None, types=None, sources=None, search=None, limit=50, offset=0, db_path=HISTORY_DB):
+    """One page of filtered dashboard rows, as dicts keyed by dashboard column name"""
+    where, params = _item_filters(websites, types, sources, search)
+    columns = ', '.join(ITEM_COLUMNS.values())
+    sql = f'SELECT {columns} FROM history_items{where} ORDER BY history_id, position'
+    if limit is not None:
+        sql += ' LIMIT ? OFFSET ?'
+        params = params + [limit, offset]
+    rows = get_connection(db_path).execute(sql, params).fetchall()
+    return [dict(zip(ITEM_COLUMNS, row)) for row in rows]
+
+def count_items(websites=None, types=None, sources=None, search=None, db_path=HISTORY_DB):
+    where, params = _item_filters(websites, types, sources, search)
+    return get_connection(db_path).execute(f'SELECT COUNT(*) FROM history_items{where}', params).fetchone()[0]
+
+def distinct_item_values(column, db_path=HISTORY_DB):
+    """Sorted distinct values of website, type or source (served from their indexes)"""
+    if column not in ('website', 'type', 'source'):
+        raise ValueError(f"Unsupported column: {column}")
+    rows = get_connection(db_path).execute(
+        f'SELECT DISTINCT {column} FROM history_items WHERE {column} IS NOT NULL ORDER BY {column}'
+    ).fetchall()
+    return [row[0] for row in rows]
+
+def item_type_counts(db_path=HISTORY_DB):
+    """{type: row count} over all history items"""
+    rows = get_connection(db_path).execute('SELECT type, COUNT(*) FROM history_items GROUP BY type').fetchall()
+    return dict(rows)
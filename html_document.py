@@ -0,0 +1,133 @@
+# html_document.py
+import codecs
+import re
+
+from metrics import stage
+from parser_backend import parse_links
+from text_regions import RAW_SCAN, TextRegions, scan_mode
+
+# Only the head of the document is searched for a <meta charset>, like browsers do
+META_SNIFF_BYTES = 4096
+
+CONTENT_TYPE_CHARSET_RE = re.compile(r'charset\s*=\s*["\']?([\w.:-]+)', re.IGNORECASE)
+META_CHARSET_RE = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?\s*([\w.:-]+)', re.IGNORECASE)
+
+BOMS = (
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+# Browsers decode these labels as windows-1252, which is a superset of both
+WINDOWS_1252_ALIASES = {'iso8859-1', 'ascii'}
+
+def _valid_codec(name):
+    """Return the normalized codec name, or None if Python does not know it"""
+    if not name:
+        return None
+    try:
+        encoding = codecs.lookup(name).name
+    except LookupError:
+        return None
+    return 'cp1252' if encoding in WINDOWS_1252_ALIASES else encoding
+
+def declared_encoding(content, content_type=''):
+    """Return the charset declared by BOM, Content-Type header or <meta charset>, if any"""
+    for bom, encoding in BOMS:
+        if content.startswith(bom):
+            return encoding
+
+    match = CONTENT_TYPE_CHARSET_RE.search(content_type or '')
+    encoding = _valid_codec(match.group(1)) if match else None
+    if encoding:
+        return encoding
+
+    match = META_CHARSET_RE.search(content[:META_SNIFF_BYTES])
+    if match:
+        return _valid_codec(match.group(1).decode('ascii', 'ignore'))
+    return None
+
+def decode_html(content, content_type=''):
+    """
+    Decode an HTML body once and return (text, encoding).
+
+    Declared charsets are used directly; undeclared bodies try strict UTF-8
+    (one C-speed pass that also yields the text) and only fall back to
+    statistical charset detection when that fails.
+    """
+    encoding = declared_encoding(content, content_type)
+    if encoding:
+        return content.decode(encoding, errors='replace'), encoding
+
+    try:
+        return content.decode('utf-8'), 'utf-8'
+    except UnicodeDecodeError:
+        pass
+
+    # Slow path: statistical detection, the same library requests uses for apparent_encoding
+    encoding = 'cp1252'
+    try:
+        from charset_normalizer import from_bytes
+        best = from_bytes(content[:65536]).best()
+        if best is not None:
+            encoding = _valid_codec(best.encoding) or encoding
+    except ImportError:
+        pass
+    return content.decode(encoding, errors='replace'), encoding
+
+class HtmlDocument:
+    """
+    A fetched page whose body is decoded exactly once.
+
+    `text` is the single decoded str handed to the parser and every extractor.
+    `links` (meta contents and anchors, from the configured parser backend),
+    `regions` (visible text and attribute values) and the full `soup` are all
+    built lazily from that same str on first access.
+    """
+
+    def __init__(self, url, content, content_type='', parser_backend=None):
+        self.url = url
+        self.content = content
+        self.content_type = content_type
+        self.parser_backend = parser_backend
+        with stage('decode'):
+            self.text, self.encoding = decode_html(content, content_type)
+        self._links = None
+        self._regions = None
+        self._soup = None
+
+    @classmethod
+    def from_response(cls, response):
+        """Build a document from a requests response without touching response.text"""
+        return cls(response.url, response.content, response.headers.get('Content-Type', ''))
+
+    @property
+    def links(self):
+        if self._links is None:
+            with stage('parse'):
+                self._links = parse_links(self.text, self.parser_backend)
+        return self._links
+
+    @property
+    def regions(self):
+        if self._regions is None:
+            links = self.links
+            with stage('regions'):
+                self._regions = TextRegions(self.text, links)
+        return self._regions
+
+    def scan_text(self, mode=None):
+        """The str the contact extractors run over: visible text plus attributes, or the raw HTML"""
+        if (mode or scan_mode()) == RAW_SCAN:
+            return self.text
+        return self.regions.scan_text
+
+    @property
+    def soup(self):
+        if self._soup is None:
+            # bs4 is only imported by the code paths that need a full tree
+            from bs4 import BeautifulSoup
+            self._soup = BeautifulSoup(self.text, 'html.parser')
+        return self._soup
@@ -0,0 +1,217 @@
+# http_cache.py
+import gzip
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from urllib.parse import urlparse, parse_qsl, urlencode
+
+from settings import get_setting
+
+DEFAULT_MAX_SIZE_MB = 200
+DEFAULT_TTL = 3600
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+def normalize_url(url):
+    """Cache key for a URL: lowercase scheme/host, no default port, no fragment, sorted query"""
+    parsed = urlparse(url.strip())
+    scheme = parsed.scheme.lower()
+    host = (parsed.hostname or '').lower()
+    if parsed.port and parsed.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parsed.port}"
+    query = urlencode(sorted(parse_qsl(parsed.query, keep_blank_values=True)))
+    return parsed._replace(scheme=scheme, netloc=host, path=parsed.path or '/', params='',
+                           query=query, fragment='').geturl()
+
+def parse_domain_ttls(value):
+    """Parse 'example.com:86400, news.example.org:0' into {domain: seconds}"""
+    ttls = {}
+    for item in (value or '').split(','):
+        domain, _, seconds = item.strip().rpartition(':')
+        if domain and seconds.strip().isdigit():
+            ttls[domain.strip().lower()] = int(seconds)
+    return ttls
+
+class CacheEntry:
+    """
+    One cached response: validators, body location and the stored extraction
+    result. result is None when it was produced by a different result_version
+    than the caller asked for, so the body gets extracted again.
+    """
+
+    def __init__(self, cache, row, result_version=None):
+        self._cache = cache
+        (self.key, self.url, self.etag, self.last_modified, self.content_type,
+         self.validated_at, self.size, result, stored_version) = row
+        self.result = json.loads(result) if result and stored_version == result_version else None
+
+    def is_fresh(self):
+        """True while the entry is inside its domain's TTL and can be used without a request"""
+        return time.time() - self.validated_at < self._cache.ttl_for(self.url)
+
+    def conditional_headers(self):
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+    def load_body(self):
+        return self._cache.load_body(self.key)
+
+class HttpCache:
+    """
+    Persistent HTTP cache: gzip-compressed bodies on disk, an SQLite index with
+    validators and access times, LRU eviction by total size and a TTL per domain.
+    """
+
+    def __init__(self, directory, max_size_bytes, default_ttl=DEFAULT_TTL, domain_ttls=None):
+        self.directory = directory
+        self.body_directory = os.path.join(directory, 'bodies')
+        self.max_size_bytes = max_size_bytes
+        self.default_ttl = default_ttl
+        self.domain_ttls = domain_ttls or {}
+        os.makedirs(self.body_directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(directory, 'index.sqlite'), check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('''
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                content_type TEXT,
+                validated_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                size INTEGER NOT NULL,
+                result TEXT,
+                result_version TEXT
+            )
+        ''')
+        columns = {row[1] for row in self._db.execute('PRAGMA table_info(entries)')}
+        if 'result_version' not in columns:
+            # Caches created before results were versioned; their results never match a version
+            self._db.execute('ALTER TABLE entries ADD COLUMN result_version TEXT')
+        self._db.execute('CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries(last_access)')
+        self._db.commit()
+
+    def ttl_for(self, url):
+        """TTL for the URL's host, matching the most specific configured parent domain"""
+        host = (urlparse(url).hostname or '').lower()
+        while host:
+            if host in self.domain_ttls:
+                return self.domain_ttls[host]
+            _, _, host = host.partition('.')
+        return self.default_ttl
+
+    def _body_path(self, key):
+        return os.path.join(self.body_directory, hashlib.sha1(key.encode('utf-8')).hexdigest() + '.gz')
+
+    def lookup(self, url, result_version=None):
+        """Return the CacheEntry for a URL (marking it recently used) or None"""
+        key = normalize_url(url)
+        with self._lock:
+            row = self._db.execute(
+                'SELECT key, url, etag, last_modified, content_type, validated_at, size, result, result_version '
+                'FROM entries WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute('UPDATE entries SET last_access = ? WHERE key = ?', (time.time(), key))
+            self._db.commit()
+        return CacheEntry(self, row, result_version)
+
+    def load_body(self, key):
+        with open(self._body_path(key), 'rb') as f:
+            return gzip.decompress(f.read())
+
+    def store(self, url, headers, content, result=None, result_version=None):
+        """Store a 200 response body with its validators and the extraction result"""
+        if 'no-store' in headers.get('Cache-Control', '').lower():
+            return
+        key = normalize_url(url)
+        compressed = gzip.compress(content, compresslevel=6)
+        result_json = json.dumps(result, ensure_ascii=False) if result is not None else None
+        size = len(compressed) + len(result_json or '')
+
+        path = self._body_path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(compressed)
+        os.replace(tmp_path, path)
+
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                'INSERT OR REPLACE INTO entries '
+                '(key, url, etag, last_modified, content_type, validated_at, last_access, size, result, result_version) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (key, url, headers.get('ETag'), headers.get('Last-Modified'),
+                 headers.get('Content-Type', ''), now, now, size, result_json, result_version)
+            )
+            self._db.commit()
+            self._evict()
+
+    def store_result(self, entry, result, result_version=None):
+        """Replace only the extraction result of an entry, keeping its body and freshness"""
+        result_json = json.dumps(result, ensure_ascii=False)
+        with self._lock:
+            self._db.execute(
+                "UPDATE entries SET size = size - LENGTH(COALESCE(result, '')) + ?, result = ?, result_version = ? "
+                'WHERE key = ?',
+                (len(result_json), result_json, result_version, entry.key)
+            )
+            self._db.commit()
+
+    def revalidated(self, entry, headers):
+        """Record a 304 Not Modified: the stored body and result stay valid for another TTL"""
+        etag = headers.get('ETag') or entry.etag
+        last_modified = headers.get('Last-Modified') or entry.last_modified
+        with self._lock:
+            self._db.execute(
+                'UPDATE entries SET etag = ?, last_modified = ?, validated_at = ? WHERE key = ?',
+                (etag, last_modified, time.time(), entry.key)
+            )
+            self._db.commit()
+
+    def _evict(self):
+        """Drop least recently used entries until the cache fits its size cap (lock held)"""
+        total = self._db.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+        if total <= self.max_size_bytes:
+            return
+        for key, size in self._db.execute('SELECT key, size FROM entries ORDER BY last_access').fetchall():
+            self._db.execute('DELETE FROM entries WHERE key = ?', (key,))
+            try:
+                os.remove(self._body_path(key))
+            except FileNotFoundError:
+                pass
+            total -= size
+            if total <= self.max_size_bytes:
+                break
+        self._db.commit()
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_http_cache():
+    """Return the process-wide cache configured in config.ini, or None when disabled"""
+    global _cache
+    if not get_setting('cache_settings', 'enabled', True, bool):
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                output_directory = get_setting('output_settings', 'output_directory', './data/')
+                _cache = HttpCache(
+                    os.path.join(output_directory, 'http_cache'),
+                    max_size_bytes=get_setting('cache_settings', 'max_size_mb', DEFAULT_MAX_SIZE_MB, int) * 1024 * 1024,
+                    default_ttl=get_setting('cache_settings', 'default_ttl', DEFAULT_TTL, int),
+                    domain_ttls=parse_domain_ttls(get_setting('cache_settings', 'domain_ttls', '')),
+                )
+    return _cache
@@ -0,0 +1,288 @@
+# http_session.py
+import threading
+import time
+import warnings
+from urllib.parse import urlparse
+
+import certifi
+import requests
+from requests.adapters import HTTPAdapter
+from requests.packages.urllib3.exceptions import InsecureRequestWarning
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from metrics import count, get_metrics, record, stage
+from proxy_pool import get_proxy_pool
+from scheduler import get_scheduler, request_timeout, time_left
+from settings import get_setting
+
+# Suppress only the single warning from urllib3 needed
+warnings.filterwarnings('ignore', category=InsecureRequestWarning)
+
+# urllib3 only decodes brotli when one of these packages is installed,
+# so only advertise "br" when we can actually read it
+try:
+    import brotli  # noqa: F401
+    BROTLI_AVAILABLE = True
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        BROTLI_AVAILABLE = True
+    except ImportError:
+        BROTLI_AVAILABLE = False
+
+DEFAULT_POOL_CONNECTIONS = 32
+DEFAULT_POOL_MAXSIZE = 32
+
+# Sent with every page and robots.txt request
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+# Body cap for pages we extract from; anything past it is never downloaded
+DEFAULT_MAX_BODY_KB = 2048
+STREAM_CHUNK_SIZE = 64 * 1024
+# Content types worth parsing for contacts; a missing Content-Type is sniffed instead
+HTML_CONTENT_TYPES = ('text/html', 'application/xhtml+xml', 'text/plain', 'application/xml', 'text/xml')
+
+class SkippedContent(Exception):
+    """The response is not a page we can extract from (e.g. a PDF or a video)"""
+
+_session = None
+_session_lock = threading.Lock()
+
+# host -> verify value that worked last time (certifi bundle path or False)
+_ssl_decisions = {}
+_ssl_lock = threading.Lock()
+
+class _TimedHTTPConnection(HTTPConnection):
+    """Reports DNS + TCP connect time of new connections to metrics"""
+
+    def _new_conn(self):
+        with stage('connect'):
+            return super()._new_conn()
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    """Reports DNS + TCP connect time and the TLS handshake separately"""
+
+    def _new_conn(self):
+        start = time.perf_counter()
+        try:
+            return super()._new_conn()
+        finally:
+            self._connect_seconds = time.perf_counter() - start
+            record('connect', self._connect_seconds)
+
+    def connect(self):
+        self._connect_seconds = 0.0
+        start = time.perf_counter()
+        super().connect()
+        record('tls', time.perf_counter() - start - self._connect_seconds)
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+def _build_session():
+    """Create the pooled session used by every scraper in this process"""
+    pool_connections = get_setting('scraping_settings', 'pool_connections', DEFAULT_POOL_CONNECTIONS, int)
+    pool_maxsize = get_setting('scraping_settings', 'pool_maxsize', DEFAULT_POOL_MAXSIZE, int)
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+    if get_metrics() is not None:
+        # Only pay for connection timing when metrics are on
+        adapter.poolmanager.pool_classes_by_scheme = {
+            'http': _TimedHTTPConnectionPool,
+            'https': _TimedHTTPSConnectionPool,
+        }
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+
+    session.headers.update({
+        'Accept-Encoding': 'gzip, deflate, br' if BROTLI_AVAILABLE else 'gzip, deflate',
+        'Connection': 'keep-alive',
+    })
+    return session
+
+def get_session():
+    """Return the process-wide pooled session, creating it on first use"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+def get_ssl_decision(host):
+    """Return the remembered verify value for a host, or None if not decided yet"""
+    with _ssl_lock:
+        return _ssl_decisions.get(host)
+
+def _remember_ssl_decision(host, verify):
+    with _ssl_lock:
+        _ssl_decisions[host] = verify
+
+def fetch(url, headers=None, timeout=None, on_response=None, deadline=None, retries=None, **kwargs):
+    """
+    GET a URL through the shared session, paced and retried by the per-host scheduler.
+
+    The certifi bundle is tried first; if certificate verification fails the
+    request is repeated with verify=False. Whichever mode worked is remembered
+    per host so later requests to that host skip the failing attempt.
+    `timeout` defaults to request_timeout from config.ini. With use_proxy on,
+    each attempt goes through a proxy from the health-scored proxy pool.
+    on_response(response), when given, runs while the host's connection slot
+    is still held, e.g. to read a streamed body (see fetch_html). A
+    time.monotonic() deadline bounds retries, pacing waits and each attempt's
+    timeout (see scheduler.PolitenessScheduler.call). retries overrides the
+    scheduler's max_retries, e.g. 0 for a quick probe.
+    """
+    host = urlparse(url).netloc.lower()
+    session = get_session()
+    if timeout is None:
+        timeout = request_timeout()
+    proxy_pool = get_proxy_pool()
+
+    def send():
+        if proxy_pool is None:
+            return send_direct()
+        # Each attempt (including scheduler retries) asks the pool again, so a
+        # failing proxy is rotated away from as soon as it is quarantined
+        proxy = proxy_pool.acquire()
+        start = time.monotonic()
+        try:
+            response = send_direct(proxies=proxy.proxies)
+        except requests.exceptions.SSLError:
+            # A certificate problem of the target site, not of the proxy
+            raise
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            proxy_pool.report(proxy, ok=False)
+            raise
+        # 407 / 502 / 504 come from the proxy itself, not the target site
+        proxy_pool.report(proxy, ok=response.status_code not in (407, 502, 504),
+                          latency=time.monotonic() - start)
+        return response
+
+    def send_direct(**proxy_kwargs):
+        # Time until the response headers arrive, including any connect and TLS handshake
+        with stage('request'):
+            response = send_verified(**proxy_kwargs)
+        count('scraper_responses_total', status=response.status_code)
+        return response
+
+    def send_verified(**proxy_kwargs):
+        request_kwargs = {**kwargs, **proxy_kwargs}
+        attempt_timeout = timeout if deadline is None else min(timeout, time_left(deadline))
+        verify = get_ssl_decision(host)
+        if verify is not None:
+            return session.get(url, headers=headers, timeout=attempt_timeout, verify=verify, **request_kwargs)
+
+        try:
+            response = session.get(url, headers=headers, timeout=attempt_timeout, verify=certifi.where(), **request_kwargs)
+            _remember_ssl_decision(host, certifi.where())
+        except requests.exceptions.SSLError:
+            # Fallback ke verify=False jika certificate bundle tidak bekerja
+            response = session.get(url, headers=headers, timeout=attempt_timeout, verify=False, **request_kwargs)
+            _remember_ssl_decision(host, False)
+        return response
+
+    def send_and_read():
+        response = send()
+        if on_response is not None:
+            on_response(response)
+        return response
+
+    return get_scheduler().call(url, send_and_read, deadline=deadline, max_retries=retries)
+
+
+def max_body_bytes():
+    return get_setting('scraping_settings', 'max_body_kb', DEFAULT_MAX_BODY_KB, int) * 1024
+
+def is_html_content_type(content_type):
+    return content_type.split(';', 1)[0].strip().lower() in HTML_CONTENT_TYPES
+
+def _looks_like_markup(chunk):
+    head = chunk[:1024].lstrip().lower()
+    return head.startswith(b'<') or b'<html' in head
+
+def _iter_body(response):
+    raw = response.raw
+    if hasattr(raw, 'read1'):
+        # urllib3 2.x hands back whatever has arrived, so a trickling stream
+        # cannot hold a read open until a whole chunk has filled up
+        while True:
+            chunk = raw.read1(STREAM_CHUNK_SIZE, decode_content=True)
+            if not chunk:
+                return
+            yield chunk
+    else:
+        yield from response.iter_content(chunk_size=STREAM_CHUNK_SIZE)
+
+def read_body(response, max_bytes, time_limit=None):
+    """
+    Read a streamed response in chunks, stopping at max_bytes or after
+    time_limit seconds (an endless or trickling stream); returns (content,
+    truncated). The connection is always released.
+    """
+    buffer = bytearray()
+    truncated = False
+    start = time.monotonic()
+    try:
+        with stage('download'):
+            for chunk in _iter_body(response):
+                buffer += chunk
+                if len(buffer) > max_bytes:
+                    truncated = True
+                    break
+                if time_limit is not None and time.monotonic() - start > time_limit:
+                    truncated = True
+                    break
+    finally:
+        response.close()
+    count('scraper_bytes_downloaded_total', len(buffer))
+    return bytes(buffer[:max_bytes]), truncated
+
+def fetch_html(url, headers=None, timeout=None, max_bytes=None, deadline=None):
+    """
+    Streaming GET for pages we extract from; returns (response, content, truncated).
+
+    Content-Type and Content-Length are checked before any body is read:
+    non-HTML responses raise SkippedContent, oversized ones are cut at
+    max_bytes (max_body_kb from config.ini) so extraction runs on the prefix.
+    Only 2xx bodies are read; for other statuses content is b''. deadline
+    (time.monotonic()) also bounds the body download, see fetch().
+    """
+    if timeout is None:
+        timeout = request_timeout()
+    if max_bytes is None:
+        max_bytes = max_body_bytes()
+
+    body = {}
+
+    def read(response):
+        # Runs inside the scheduler slot so max_connections_per_host also covers the download
+        if not 200 <= response.status_code < 300:
+            return
+        content_type = response.headers.get('Content-Type', '')
+        if content_type and not is_html_content_type(content_type):
+            response.close()
+            raise SkippedContent(f"Skipped non-HTML content ({content_type.split(';', 1)[0].strip()})")
+
+        # Content-Length tells us up front the body will be cut; the prefix is still worth extracting
+        content_length = response.headers.get('Content-Length', '')
+        announced_too_large = content_length.isdigit() and int(content_length) > max_bytes
+
+        time_limit = timeout if deadline is None else min(timeout, time_left(deadline))
+        content, truncated = read_body(response, max_bytes, time_limit=time_limit)
+        if not content_type and content and not _looks_like_markup(content):
+            raise SkippedContent("Skipped content that does not look like HTML")
+        body['content'], body['truncated'] = content, truncated or announced_too_large
+
+    response = fetch(url, headers=headers, timeout=timeout, stream=True, on_response=read, deadline=deadline)
+    if 'content' not in body:
+        response.close()
+        return response, b'', False
+    return response, body['content'], body['truncated']
@@ -0,0 +1,216 @@
+# metrics.py
+import atexit
+import logging
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from settings import get_setting
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EXPORT_INTERVAL = 15
+# Histogram bucket upper bounds in seconds
+STAGE_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+COUNTER_HELP = {
+    'scraper_bytes_downloaded_total': 'Response body bytes read',
+    'scraper_responses_total': 'HTTP responses received, by status code',
+    'scraper_matches_total': 'Contact matches extracted, by kind',
+}
+
+class Metrics:
+    """Stage timing histograms and counters for the whole process, rendered in Prometheus text format"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # stage -> [bucket counts..., +Inf count, sum of seconds]
+        self._stages = {}
+        # (name, sorted label items) -> value
+        self._counters = {}
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            series = self._stages.get(stage)
+            if series is None:
+                series = self._stages[stage] = [0] * (len(STAGE_BUCKETS) + 1) + [0.0]
+            for index, bound in enumerate(STAGE_BUCKETS):
+                if seconds <= bound:
+                    series[index] += 1
+            series[len(STAGE_BUCKETS)] += 1
+            series[-1] += seconds
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format"""
+        with self._lock:
+            stages = {stage: list(series) for stage, series in self._stages.items()}
+            counters = dict(self._counters)
+
+        lines = ['# HELP scraper_stage_seconds Time spent per scrape stage',
+                 '# TYPE scraper_stage_seconds histogram']
+        for stage, series in sorted(stages.items()):
+            for bound, bucket_count in zip(STAGE_BUCKETS, series):
+                lines.append(f'scraper_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {bucket_count}')
+            lines.append(f'scraper_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {series[len(STAGE_BUCKETS)]}')
+            lines.append(f'scraper_stage_seconds_sum{{stage="{stage}"}} {series[-1]:.6f}')
+            lines.append(f'scraper_stage_seconds_count{{stage="{stage}"}} {series[len(STAGE_BUCKETS)]}')
+
+        for name in sorted({name for name, _ in counters}):
+            lines.append(f'# HELP {name} {COUNTER_HELP.get(name, name)}')
+            lines.append(f'# TYPE {name} counter')
+            for (counter_name, labels), value in sorted(counters.items()):
+                if counter_name != name:
+                    continue
+                label_text = ','.join(f'{k}="{v}"' for k, v in labels)
+                lines.append(f'{name}{{{label_text}}} {value}' if label_text else f'{name} {value}')
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path):
+        """Write render() atomically, e.g. for the node_exporter textfile collector"""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.render())
+        os.replace(tmp_path, path)
+
+# Per-thread timings of the scrape currently running, see Trace
+_local = threading.local()
+
+class _Stage:
+    __slots__ = ('metrics', 'name', 'start')
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        record(self.name, time.perf_counter() - self.start, self.metrics)
+        return False
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+NULL_STAGE = _NullStage()
+
+def stage(name):
+    """Context manager timing one stage; a shared no-op when metrics are disabled"""
+    metrics = get_metrics()
+    if metrics is None:
+        return NULL_STAGE
+    return _Stage(metrics, name)
+
+def record(name, seconds, metrics=None):
+    """Add an already measured stage duration to the metrics and the current trace"""
+    metrics = metrics or get_metrics()
+    if metrics is None:
+        return
+    metrics.observe(name, seconds)
+    timings = getattr(_local, 'timings', None)
+    if timings is not None:
+        timings[name] = timings.get(name, 0.0) + seconds
+
+def count(name, value=1, **labels):
+    metrics = get_metrics()
+    if metrics is not None and value:
+        metrics.inc(name, value, **labels)
+
+class Trace:
+    """
+    Collects the stage timings of one scrape made in this thread.
+
+        with Trace() as timings:
+            ...
+        result['timings'] = timings   # {stage: milliseconds, 'total': ...}
+
+    The dict stays empty when metrics are disabled.
+    """
+
+    def __enter__(self):
+        self.timings = {}
+        self._outer = getattr(_local, 'timings', None)
+        if get_metrics() is not None:
+            _local.timings = self.timings
+            self._start = time.perf_counter()
+        return self.timings
+
+    def __exit__(self, *exc_info):
+        if get_metrics() is not None:
+            _local.timings = self._outer
+            self.timings['total'] = time.perf_counter() - self._start
+            for name, seconds in self.timings.items():
+                self.timings[name] = round(seconds * 1000, 2)
+        return False
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?', 1)[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = get_metrics().render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Scrapes of the endpoint would otherwise flood stderr
+        pass
+
+def _start_exporters(metrics):
+    export_file = get_setting('metrics_settings', 'export_file', '')
+    if export_file:
+        interval = get_setting('metrics_settings', 'export_interval', DEFAULT_EXPORT_INTERVAL, float)
+
+        def export_loop():
+            while True:
+                time.sleep(interval)
+                try:
+                    metrics.write(export_file)
+                except OSError as e:
+                    logger.warning(f"Could not write metrics to {export_file}: {str(e)}")
+
+        threading.Thread(target=export_loop, name='metrics-export', daemon=True).start()
+        atexit.register(metrics.write, export_file)
+
+    port = get_setting('metrics_settings', 'port', 0, int)
+    if port:
+        try:
+            server = ThreadingHTTPServer(('127.0.0.1', port), _MetricsHandler)
+        except OSError as e:
+            logger.warning(f"Metrics endpoint not started on port {port}: {str(e)}")
+        else:
+            threading.Thread(target=server.serve_forever, name='metrics-http', daemon=True).start()
+            logger.info(f"Serving metrics on http://127.0.0.1:{port}/metrics")
+
+_metrics = None
+_metrics_loaded = False
+_metrics_lock = threading.Lock()
+
+def get_metrics():
+    """Process-wide Metrics from config.ini [metrics_settings]; None when disabled"""
+    global _metrics, _metrics_loaded
+    if not _metrics_loaded:
+        with _metrics_lock:
+            if not _metrics_loaded:
+                if get_setting('metrics_settings', 'enabled', False, bool):
+                    _metrics = Metrics()
+                    _start_exporters(_metrics)
+                _metrics_loaded = True
+    return _metrics
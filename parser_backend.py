@@ -0,0 +1,93 @@
+# parser_backend.py
+from settings import get_setting
+
+# lxml is optional; without it we fall back to Python's html.parser
+try:
+    import lxml.html
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+# The scrapers only ever read <meta content> and <a href>, so nothing else
+# needs to be materialized
+LINK_TAGS = ['a', 'meta']
+
+class ParsedLinks:
+    """The parts of a page the extractors use: meta content values and anchors"""
+
+    def __init__(self, meta_contents, anchors):
+        self.meta_contents = meta_contents
+        # list of (href, anchor text)
+        self.anchors = anchors
+
+    @property
+    def hrefs(self):
+        return [href for href, _ in self.anchors]
+
+def _links_from_soup(soup):
+    meta_contents = [meta.get('content', '') for meta in soup.find_all('meta', content=True)]
+    anchors = [(a['href'], a.get_text(' ', strip=True)) for a in soup.find_all('a', href=True)]
+    return ParsedLinks(meta_contents, anchors)
+
+def _parse_lxml(text):
+    """C-backed lxml parse, reading the two tag types straight off the tree"""
+    if not text.strip():
+        return ParsedLinks([], [])
+    parser = lxml.html.HTMLParser(encoding='utf-8')
+    root = lxml.html.document_fromstring(text.encode('utf-8'), parser=parser)
+
+    meta_contents = []
+    anchors = []
+    for element in root.iter('a', 'meta'):
+        if element.tag == 'meta':
+            content = element.get('content')
+            if content is not None:
+                meta_contents.append(content)
+        else:
+            href = element.get('href')
+            if href is not None:
+                anchors.append((href, ' '.join(element.text_content().split())))
+    return ParsedLinks(meta_contents, anchors)
+
+# bs4 is imported inside the soup backends so the default lxml path never loads it
+
+def _parse_soup_lxml(text):
+    from bs4 import BeautifulSoup, SoupStrainer
+    return _links_from_soup(BeautifulSoup(text, 'lxml', parse_only=SoupStrainer(LINK_TAGS)))
+
+def _parse_soup_strained(text):
+    from bs4 import BeautifulSoup, SoupStrainer
+    return _links_from_soup(BeautifulSoup(text, 'html.parser', parse_only=SoupStrainer(LINK_TAGS)))
+
+def _parse_html_parser(text):
+    # Full tree, kept for comparison and as the last-resort fallback
+    from bs4 import BeautifulSoup
+    return _links_from_soup(BeautifulSoup(text, 'html.parser'))
+
+PARSER_BACKENDS = {
+    'lxml': _parse_lxml,
+    'soup-lxml': _parse_soup_lxml,
+    'soup-strained': _parse_soup_strained,
+    'html.parser': _parse_html_parser,
+}
+
+def available_backends():
+    """Backends that can run in this environment, fastest first"""
+    if LXML_AVAILABLE:
+        return list(PARSER_BACKENDS)
+    return ['soup-strained', 'html.parser']
+
+def resolve_backend(name=None):
+    """
+    Map a backend name (or 'auto' / None, read from config.ini parser_backend)
+    to a parse function, falling back when lxml is not installed
+    """
+    if name is None:
+        name = get_setting('scraping_settings', 'parser_backend', 'auto')
+    if name not in available_backends():
+        name = available_backends()[0]
+    return PARSER_BACKENDS[name]
+
+def parse_links(text, backend=None):
+    """Parse decoded HTML and return its ParsedLinks using the chosen backend"""
+    return resolve_backend(backend)(text)
@@ -0,0 +1,89 @@
+# phone_normalizer.py
+import re
+from functools import lru_cache
+
+import phonenumbers
+from phonenumbers import NumberParseException, PhoneNumberFormat
+
+from settings import get_setting
+
+DEFAULT_PHONE_REGION = 'US'
+# Distinct candidate strings whose parse result is kept; pages of one site repeat the same footer numbers
+PARSE_CACHE_SIZE = 4096
+
+# One pass over the text for anything shaped like a phone number: an optional
+# "+", then digits with the usual separators, starting and ending on a digit
+# (or a closing parenthesis) that is not glued to a word or another number
+PHONE_CANDIDATE_RE = re.compile(r'(?<![\w+.,/-])\+?\(?\d[\d \t().\-/]{5,22}\d(?![\w]|[.,/-]\d)')
+# 2024-01-31, 31/01/2024, 31.01.24 ...
+DATE_RE = re.compile(r'\d{4}[-/.]\d{1,2}[-/.]\d{1,2}|\d{1,2}[-/.]\d{1,2}[-/.]\d{2,4}')
+STRIP_SEPARATORS = str.maketrans('', '', ' \t().-/+')
+CURRENCY_MARKS = ('$', '€', '£', '¥', '₹', 'Rp', 'USD', 'IDR', 'EUR')
+
+def default_region():
+    """Region used for numbers written without a country code (ISO 3166 code from config.ini)"""
+    return get_setting('scraping_settings', 'phone_region', DEFAULT_PHONE_REGION).upper()
+
+def is_candidate(raw, preceding=''):
+    """
+    Cheap checks that throw out most non-phones before the phonenumbers parse:
+    bare digit runs (IDs, timestamps), digit count, repeated digits, prices
+    and dates. `preceding` is the text right before the match.
+    """
+    if raw.isdigit() and raw[0] != '0':
+        # A bare run of digits is far more often an order number than a phone
+        return False
+    digits = raw.translate(STRIP_SEPARATORS)
+    if not 7 <= len(digits) <= 15:
+        return False
+    if len(set(digits)) <= 2:
+        return False
+    if preceding.rstrip().endswith(CURRENCY_MARKS):
+        return False
+    if DATE_RE.fullmatch(raw):
+        return False
+    return True
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _parse(raw, region):
+    """(E.164, display form) for a valid number, else None; memoized per distinct string"""
+    try:
+        number = phonenumbers.parse(raw, region)
+    except NumberParseException:
+        return None
+    if not phonenumbers.is_valid_number(number):
+        return None
+    return (phonenumbers.format_number(number, PhoneNumberFormat.E164),
+            phonenumbers.format_number(number, PhoneNumberFormat.INTERNATIONAL))
+
+def normalize_phone(raw, region=None):
+    """The international display form of one number, or None if it is not a valid phone number"""
+    parsed = _parse(' '.join(raw.split()), region or default_region())
+    return parsed[1] if parsed else None
+
+def find_phones(text, tel_links=(), region=None):
+    """
+    Valid phone numbers in the text plus tel: link targets, deduped on E.164.
+
+    Returns display strings ("+1 415-555-2671") in the order first seen.
+    """
+    region = region or default_region()
+    found = {}
+
+    for href in tel_links:
+        parsed = _parse(' '.join(href.split(':', 1)[-1].split()), region)
+        if parsed:
+            found.setdefault(parsed[0], parsed[1])
+
+    for match in PHONE_CANDIDATE_RE.finditer(text):
+        raw = match.group(0)
+        if not is_candidate(raw, text[max(0, match.start() - 4):match.start()]):
+            continue
+        parsed = _parse(' '.join(raw.split()), region)
+        if parsed:
+            found.setdefault(parsed[0], parsed[1])
+    return list(found.values())
+
+def parse_cache_info():
+    """Hit/miss counters of the memoized parse (functools cache_info)"""
+    return _parse.cache_info()
@@ -0,0 +1,162 @@
+# proxy_pool.py
+import logging
+import math
+import os
+import random
+import threading
+import time
+
+from settings import get_setting
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ROTATION_INTERVAL = 10
+# Weight of the newest sample in the latency / error-rate moving averages
+EWMA_ALPHA = 0.3
+# Consecutive failures before a proxy is quarantined, and its backoff range in seconds
+QUARANTINE_AFTER = 2
+QUARANTINE_BASE = 30
+QUARANTINE_MAX = 600
+# Share of the healthy proxies, fastest first, that new traffic is spread over
+FASTEST_SHARE = 0.25
+
+def load_proxies(path):
+    """Proxy URLs from a file, one per line; '#' comments and blank lines are ignored"""
+    proxies = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.split('#', 1)[0].strip()
+            if line:
+                proxies.append(line if '://' in line else f"http://{line}")
+    return proxies
+
+class ProxyStats:
+    """Health of one proxy: moving averages of latency and errors, plus quarantine state"""
+
+    def __init__(self, url):
+        self.url = url
+        self.latency = None
+        self.error_rate = 0.0
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.quarantines = 0
+        self.quarantined_until = 0.0
+
+    @property
+    def proxies(self):
+        """The `proxies` mapping for requests"""
+        return {'http': self.url, 'https': self.url}
+
+    def is_quarantined(self, now=None):
+        return (now or time.monotonic()) < self.quarantined_until
+
+    def score(self):
+        """Lower is better: latency inflated by the error rate; untried proxies go first"""
+        if self.latency is None:
+            return 0.0
+        return self.latency / max(0.05, 1.0 - self.error_rate)
+
+class ProxyPool:
+    """
+    Rotating proxy pool with health scoring.
+
+    The same proxy serves `rotation_interval` requests, then the next one is
+    picked at random among the fastest healthy proxies. A proxy that fails
+    QUARANTINE_AFTER times in a row is quarantined with exponential backoff
+    and rotated away from at once, so a few slow or dead proxies cannot drag
+    a batch down.
+    """
+
+    def __init__(self, proxy_urls, rotation_interval=DEFAULT_ROTATION_INTERVAL):
+        if not proxy_urls:
+            raise ValueError("ProxyPool needs at least one proxy")
+        self.stats = [ProxyStats(url) for url in proxy_urls]
+        self.rotation_interval = max(1, rotation_interval)
+        self._lock = threading.Lock()
+        self._current = None
+        self._current_uses = 0
+
+    def _pick(self, now):
+        healthy = [p for p in self.stats if not p.is_quarantined(now)]
+        if not healthy:
+            # Everything is quarantined: use the proxy that comes back first rather than stalling
+            return min(self.stats, key=lambda p: p.quarantined_until)
+        healthy.sort(key=ProxyStats.score)
+        fastest = healthy[:max(1, math.ceil(len(healthy) * FASTEST_SHARE))]
+        return random.choice(fastest)
+
+    def acquire(self):
+        """The proxy to use for the next request"""
+        now = time.monotonic()
+        with self._lock:
+            if (self._current is None or self._current_uses >= self.rotation_interval
+                    or self._current.is_quarantined(now)):
+                self._current = self._pick(now)
+                self._current_uses = 0
+            self._current_uses += 1
+            return self._current
+
+    def report(self, proxy, ok, latency=None):
+        """Feed back the outcome of a request made through `proxy`"""
+        with self._lock:
+            proxy.requests += 1
+            proxy.error_rate = (1 - EWMA_ALPHA) * proxy.error_rate + EWMA_ALPHA * (0.0 if ok else 1.0)
+            if ok:
+                proxy.consecutive_failures = 0
+                proxy.quarantines = 0
+                if latency is not None:
+                    proxy.latency = latency if proxy.latency is None else (
+                        (1 - EWMA_ALPHA) * proxy.latency + EWMA_ALPHA * latency)
+                return
+
+            proxy.failures += 1
+            if proxy.is_quarantined():
+                # Requests already in flight when it was quarantined; don't escalate the backoff
+                return
+            proxy.consecutive_failures += 1
+            if proxy.consecutive_failures >= QUARANTINE_AFTER:
+                backoff = min(QUARANTINE_MAX, QUARANTINE_BASE * (2 ** proxy.quarantines))
+                proxy.quarantines += 1
+                proxy.consecutive_failures = 0
+                proxy.quarantined_until = time.monotonic() + backoff
+                logger.warning(f"Proxy {proxy.url} quarantined for {backoff}s")
+                if proxy is self._current:
+                    self._current = None
+
+    def snapshot(self):
+        """Per-proxy health as a list of dicts (for logging or a debug view)"""
+        now = time.monotonic()
+        with self._lock:
+            return [{
+                'proxy': p.url,
+                'latency_ms': round(p.latency * 1000, 1) if p.latency is not None else None,
+                'error_rate': round(p.error_rate, 3),
+                'requests': p.requests,
+                'failures': p.failures,
+                'quarantined_for': round(max(0.0, p.quarantined_until - now), 1),
+            } for p in self.stats]
+
+_pool = None
+_pool_loaded = False
+_pool_lock = threading.Lock()
+
+def get_proxy_pool():
+    """Process-wide pool from config.ini [proxy_settings]; None when proxies are off or none are listed"""
+    global _pool, _pool_loaded
+    if not _pool_loaded:
+        with _pool_lock:
+            if not _pool_loaded:
+                if get_setting('proxy_settings', 'use_proxy', False, bool):
+                    path = get_setting('proxy_settings', 'proxy_list', 'proxies.txt')
+                    proxy_urls = load_proxies(path) if os.path.exists(path) else []
+                    if proxy_urls:
+                        _pool = ProxyPool(
+                            proxy_urls,
+                            rotation_interval=get_setting('proxy_settings', 'proxy_rotation_interval',
+                                                          DEFAULT_ROTATION_INTERVAL, int),
+                        )
+                    else:
+                        logger.warning(f"use_proxy is on but {path} has no proxies; connecting directly")
+                _pool_loaded = True
+    return _pool
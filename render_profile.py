@@ -0,0 +1,99 @@
+# render_profile.py
+from urllib.parse import urlparse
+
+from settings import get_setting
+
+DEFAULT_BLOCKED_RESOURCE_TYPES = 'image, font, media'
+DEFAULT_BLOCKED_HOSTS = ('google-analytics.com, googletagmanager.com, doubleclick.net, facebook.net, '
+                         'hotjar.com, segment.io, intercom.io, clarity.ms')
+
+# Second-level labels under which the registrable domain has three labels (acme.co.uk)
+SECOND_LEVEL_SUFFIXES = {'co', 'com', 'net', 'org', 'ac', 'gov', 'edu'}
+
+def _parse_list(value):
+    return {item.strip().lower() for item in (value or '').split(',') if item.strip()}
+
+def _base_domain(host):
+    """Registrable part of a host: www.cdn.acme.com -> acme.com, shop.acme.co.uk -> acme.co.uk"""
+    labels = host.lower().split('.')
+    if len(labels) > 2 and len(labels[-1]) == 2 and labels[-2] in SECOND_LEVEL_SUFFIXES:
+        return '.'.join(labels[-3:])
+    return '.'.join(labels[-2:])
+
+def _host_matches(host, domains):
+    """True if host is one of the domains or a subdomain of one"""
+    while host:
+        if host in domains:
+            return True
+        _, _, host = host.partition('.')
+    return False
+
+class RenderProfile:
+    """
+    How a page is rendered: which requests are aborted through page.route()
+    and which load state page.goto() waits for.
+
+    The lean profile drops images, fonts, media and deny-listed hosts, and
+    only waits for the DOM; callers then wait for the selector they actually
+    need instead of 'networkidle'. Blocking every third-party script is opt-in
+    (block_third_party_scripts): many sites load their bundles from a CDN
+    and would render empty without them.
+    """
+
+    def __init__(self, name, blocked_resource_types=(), blocked_hosts=(), block_third_party_scripts=False,
+                 wait_until='domcontentloaded'):
+        self.name = name
+        self.blocked_resource_types = set(blocked_resource_types)
+        self.blocked_hosts = set(blocked_hosts)
+        self.block_third_party_scripts = block_third_party_scripts
+        self.wait_until = wait_until
+
+    @property
+    def intercepts(self):
+        return bool(self.blocked_resource_types or self.blocked_hosts or self.block_third_party_scripts)
+
+    def should_block(self, request_url, resource_type, page_url):
+        """Decide for one request made while rendering page_url"""
+        if resource_type in self.blocked_resource_types:
+            return True
+        host = (urlparse(request_url).hostname or '').lower()
+        if not host:
+            # data:, blob: and similar never hit the network
+            return False
+        if _host_matches(host, self.blocked_hosts):
+            return True
+        if self.block_third_party_scripts and resource_type == 'script':
+            page_host = (urlparse(page_url).hostname or '').lower()
+            return _base_domain(host) != _base_domain(page_host)
+        return False
+
+    async def apply(self, page, url):
+        """Install the request filter on a page before it navigates to url"""
+        if not self.intercepts:
+            return
+
+        async def handle(route):
+            request = route.request
+            if self.should_block(request.url, request.resource_type, url):
+                await route.abort()
+            else:
+                # fallback() rather than continue_() so context-level routes (e.g. HAR replay) still apply
+                await route.fallback()
+
+        await page.route('**/*', handle)
+
+FULL_PROFILE = RenderProfile('full', wait_until='networkidle')
+
+def lean_profile_from_config():
+    return RenderProfile(
+        'lean',
+        blocked_resource_types=_parse_list(get_setting('browser_settings', 'blocked_resource_types', DEFAULT_BLOCKED_RESOURCE_TYPES)),
+        blocked_hosts=_parse_list(get_setting('browser_settings', 'blocked_hosts', DEFAULT_BLOCKED_HOSTS)),
+        block_third_party_scripts=get_setting('browser_settings', 'block_third_party_scripts', False, bool),
+    )
+
+def get_render_profile(name=None):
+    """'lean' or 'full'; None reads render_profile from config.ini (default 'lean')"""
+    if name is None:
+        name = get_setting('browser_settings', 'render_profile', 'lean')
+    return FULL_PROFILE if name == 'full' else lean_profile_from_config()
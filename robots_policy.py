@@ -0,0 +1,243 @@
+# robots_policy.py
+import logging
+import os
+import re
+import threading
+import time
+from urllib.parse import urlparse
+
+from http_session import DEFAULT_HEADERS, fetch, read_body
+from scheduler import get_scheduler
+from settings import get_setting
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ROBOTS_TTL = 86400
+# robots.txt that could not be fetched (5xx, network error) leaves the site's
+# policy unknown; that verdict is only kept briefly so the file is tried again soon
+UNREACHABLE_TTL = 300
+# A probe, not a page fetch: short timeout and no retry backoff
+ROBOTS_TIMEOUT = 5
+# RFC 9309: crawlers must parse at least 500 KiB
+MAX_ROBOTS_BYTES = 500 * 1024
+
+class RobotsUnreachable(Exception):
+    """robots.txt could not be fetched, so the site is most likely down; not the same as disallowed"""
+
+class RobotsRules:
+    """
+    The rules of one robots.txt for our user agent, compiled for fast checks.
+
+    Rules are kept longest pattern first, so the first match is the one RFC 9309
+    says wins (allow beats disallow on a tie). Plain patterns are checked with
+    str.startswith; only patterns with '*' or '$' use a regex.
+    """
+
+    def __init__(self, rules=(), crawl_delay=None, error=None):
+        # (pattern length, allow, prefix or None, regex or None)
+        self._rules = sorted(rules, key=lambda rule: (-rule[0], not rule[1]))
+        self.crawl_delay = crawl_delay
+        # Set when robots.txt was unreachable; RobotsPolicy.allowed raises it
+        self.error = error
+
+    @classmethod
+    def allow_all(cls):
+        return cls()
+
+    @classmethod
+    def disallow_all(cls):
+        return cls([_compile_rule('/', allow=False)])
+
+    @classmethod
+    def unreachable(cls, error):
+        return cls(error=error)
+
+    @classmethod
+    def parse(cls, text, user_agent='*'):
+        """Parse robots.txt text, keeping the group(s) for user_agent, else the '*' group(s)"""
+        agent = user_agent.lower()
+        groups = []
+        current_agents, current_rules, current_delay = [], [], None
+        in_agent_lines = False
+
+        for line in text[:MAX_ROBOTS_BYTES].splitlines():
+            line = line.split('#', 1)[0].strip()
+            key, sep, value = line.partition(':')
+            if not sep:
+                continue
+            key, value = key.strip().lower(), value.strip()
+
+            if key == 'user-agent':
+                if not in_agent_lines:
+                    if current_agents:
+                        groups.append((current_agents, current_rules, current_delay))
+                    current_agents, current_rules, current_delay = [], [], None
+                    in_agent_lines = True
+                current_agents.append(value.lower())
+                continue
+
+            in_agent_lines = False
+            if not current_agents:
+                continue
+            if key in ('allow', 'disallow') and value:
+                current_rules.append(_compile_rule(value, allow=(key == 'allow')))
+            elif key == 'crawl-delay':
+                try:
+                    current_delay = float(value)
+                except ValueError:
+                    pass
+        if current_agents:
+            groups.append((current_agents, current_rules, current_delay))
+
+        matching = [g for g in groups if agent != '*' and any(a != '*' and a in agent for a in g[0])]
+        if not matching:
+            matching = [g for g in groups if '*' in g[0]]
+
+        rules = [rule for _, group_rules, _ in matching for rule in group_rules]
+        delays = [delay for _, _, delay in matching if delay is not None]
+        return cls(rules, max(delays) if delays else None)
+
+    def allowed(self, path):
+        """True if path (path plus query, starting with '/') may be fetched"""
+        if path == '/robots.txt':
+            return True
+        for _, allow, prefix, regex in self._rules:
+            if prefix is not None:
+                if path.startswith(prefix):
+                    return allow
+            elif regex.match(path):
+                return allow
+        return True
+
+def _compile_rule(pattern, allow):
+    if '*' not in pattern and not pattern.endswith('$'):
+        return (len(pattern), allow, pattern, None)
+    anchored = pattern.endswith('$')
+    body = pattern[:-1] if anchored else pattern
+    regex = '.*'.join(re.escape(part) for part in body.split('*')) + (r'\Z' if anchored else '')
+    return (len(pattern), allow, None, re.compile(regex, re.DOTALL))
+
+def _origin(parsed):
+    return f"{parsed.scheme}://{parsed.netloc.lower()}"
+
+class RobotsPolicy:
+    """
+    robots.txt cache: fetched once per origin, parsed into RobotsRules and kept
+    in memory for `ttl` seconds, optionally with an on-disk copy reused by later
+    runs. Crawl-delay is passed to the scheduler as the host's minimum delay.
+    """
+
+    def __init__(self, user_agent='*', ttl=DEFAULT_ROBOTS_TTL, directory=None, scheduler=None):
+        self.user_agent = user_agent
+        self.ttl = ttl
+        self.directory = directory
+        self.scheduler = scheduler or get_scheduler()
+        # origin -> (RobotsRules, expires_at); read without locking on the hot path
+        self._rules = {}
+        self._origin_locks = {}
+        self._locks_lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def allowed(self, url):
+        """
+        May this URL be fetched? Costs a dict lookup and a few prefix checks once
+        cached. Raises RobotsUnreachable while the site's robots.txt cannot be fetched.
+        """
+        parsed = urlparse(url)
+        if parsed.scheme not in ('http', 'https'):
+            return True
+        path = (parsed.path or '/') + (f"?{parsed.query}" if parsed.query else '')
+        rules = self.rules_for(parsed)
+        if rules.error:
+            raise RobotsUnreachable(rules.error)
+        return rules.allowed(path)
+
+    def rules_for(self, parsed):
+        origin = _origin(parsed)
+        cached = self._rules.get(origin)
+        if cached is not None and cached[1] > time.time():
+            return cached[0]
+
+        with self._origin_lock(origin):
+            # Another thread may have loaded it while we waited
+            cached = self._rules.get(origin)
+            if cached is not None and cached[1] > time.time():
+                return cached[0]
+            rules, ttl = self._load(origin)
+            self._rules[origin] = (rules, time.time() + ttl)
+        if rules.crawl_delay:
+            self.scheduler.set_min_delay(parsed.hostname or '', rules.crawl_delay)
+        return rules
+
+    def _origin_lock(self, origin):
+        with self._locks_lock:
+            return self._origin_locks.setdefault(origin, threading.Lock())
+
+    def _disk_path(self, origin):
+        return os.path.join(self.directory, re.sub(r'[^A-Za-z0-9.-]', '_', origin) + '.txt')
+
+    def _load(self, origin):
+        """(RobotsRules, ttl) from the disk copy when still fresh, else from the site"""
+        if self.directory:
+            path = self._disk_path(origin)
+            try:
+                age = time.time() - os.path.getmtime(path)
+                if age < self.ttl:
+                    with open(path, 'r', encoding='utf-8') as f:
+                        return RobotsRules.parse(f.read(), self.user_agent), self.ttl - age
+            except OSError:
+                pass
+
+        try:
+            response = fetch(f"{origin}/robots.txt", headers=DEFAULT_HEADERS, timeout=ROBOTS_TIMEOUT,
+                             retries=0, stream=True)
+            # Only the part we would parse is downloaded
+            body, _ = read_body(response, MAX_ROBOTS_BYTES) if response.status_code < 400 else (b'', False)
+        except Exception as e:
+            logger.warning(f"robots.txt unreachable for {origin}: {str(e)}")
+            return RobotsRules.unreachable(f"robots.txt unreachable: {str(e)}"), UNREACHABLE_TTL
+
+        response.close()
+        if response.status_code >= 500:
+            return RobotsRules.unreachable(f"robots.txt unreachable: HTTP {response.status_code}"), UNREACHABLE_TTL
+        # Any 4xx (including 404) means there are no restrictions
+        text = body.decode('utf-8', errors='replace')  # RFC 9309: robots.txt is UTF-8
+
+        if self.directory:
+            path = self._disk_path(origin)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(text)
+            os.replace(tmp_path, path)
+        return RobotsRules.parse(text, self.user_agent), self.ttl
+
+_policy = None
+_policy_lock = threading.Lock()
+
+def get_robots_policy():
+    """Process-wide policy from config.ini [robots_settings], or None when disabled"""
+    global _policy
+    if not get_setting('robots_settings', 'enabled', True, bool):
+        return None
+    if _policy is None:
+        with _policy_lock:
+            if _policy is None:
+                directory = None
+                if get_setting('robots_settings', 'cache_to_disk', True, bool):
+                    output_directory = get_setting('output_settings', 'output_directory', './data/')
+                    directory = os.path.join(output_directory, 'robots')
+                _policy = RobotsPolicy(
+                    user_agent=get_setting('robots_settings', 'user_agent', '*'),
+                    ttl=get_setting('robots_settings', 'ttl', DEFAULT_ROBOTS_TTL, int),
+                    directory=directory,
+                )
+    return _policy
+
+def robots_allowed(url):
+    """
+    True when robots.txt permits the URL (always True with robots checks disabled).
+    Raises RobotsUnreachable when robots.txt could not be fetched.
+    """
+    policy = get_robots_policy()
+    return policy is None or policy.allowed(url)
@@ -0,0 +1,236 @@
+# scheduler.py
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+import requests
+
+from metrics import record
+from settings import get_setting
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REQUEST_TIMEOUT = 30
+DEFAULT_REQUEST_DELAY = 1.5
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_MAX_CONNECTIONS_PER_HOST = 2
+DEFAULT_REQUEST_BURST = 1
+DEFAULT_BACKOFF_BASE = 1.0
+DEFAULT_BACKOFF_MAX = 30.0
+
+# Responses worth another try: throttling and transient server/gateway errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+class DeadlineExceeded(TimeoutError):
+    """A caller's overall time budget ran out before the request could be made"""
+
+def time_left(deadline):
+    """Seconds until a time.monotonic() deadline (None: no deadline); raises DeadlineExceeded once past"""
+    if deadline is None:
+        return None
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise DeadlineExceeded("Time budget exhausted")
+    return remaining
+
+def request_timeout():
+    """Per-request timeout in seconds from config.ini scraping_settings"""
+    return get_setting('scraping_settings', 'request_timeout', DEFAULT_REQUEST_TIMEOUT, float)
+
+def host_key(url):
+    return (urlparse(url).hostname or '').lower()
+
+class TokenBucket:
+    """
+    Reservation-based token bucket: `rate` tokens per second, up to `capacity`.
+
+    reserve() always takes a token and returns how long the caller must sleep
+    before using it, so waiting happens outside the lock and callers are
+    served in arrival order.
+    """
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        with self._lock:
+            now = time.monotonic()
+            wait = max(0.0, self.paused_until - now)
+            if self.rate <= 0:
+                return wait
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            if self.tokens < 0:
+                wait = max(wait, -self.tokens / self.rate)
+            return wait
+
+    def set_rate(self, rate):
+        with self._lock:
+            now = time.monotonic()
+            if self.rate > 0:
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.rate = rate
+
+    def pause(self, seconds):
+        """Hold every later reservation back for at least `seconds` (e.g. after a 429)"""
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+class _HostState:
+    def __init__(self, delay, burst, max_connections):
+        self.delay = delay
+        self.bucket = TokenBucket(1.0 / delay if delay > 0 else 0, burst)
+        self.connections = threading.BoundedSemaphore(max_connections)
+
+class PolitenessScheduler:
+    """
+    Per-host pacing for every outgoing request.
+
+    Each host gets its own token bucket (one request per `request_delay`
+    seconds, bursts of `burst`) and a cap on concurrent connections, so a
+    batch can talk to many domains in parallel while no single site sees
+    more than that. Failed requests are retried up to `max_retries` times
+    with jittered exponential backoff.
+    """
+
+    def __init__(self, request_delay=DEFAULT_REQUEST_DELAY, max_retries=DEFAULT_MAX_RETRIES,
+                 max_connections_per_host=DEFAULT_MAX_CONNECTIONS_PER_HOST, burst=DEFAULT_REQUEST_BURST,
+                 backoff_base=DEFAULT_BACKOFF_BASE, backoff_max=DEFAULT_BACKOFF_MAX):
+        self.request_delay = request_delay
+        self.max_retries = max_retries
+        self.max_connections_per_host = max(1, max_connections_per_host)
+        self.burst = max(1, burst)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._hosts = {}
+        self._hosts_lock = threading.Lock()
+
+    def _host(self, host):
+        state = self._hosts.get(host)
+        if state is None:
+            with self._hosts_lock:
+                state = self._hosts.get(host)
+                if state is None:
+                    state = self._hosts[host] = _HostState(self.request_delay, self.burst,
+                                                           self.max_connections_per_host)
+        return state
+
+    def set_min_delay(self, url_or_host, seconds):
+        """Slow a host down to at least one request per `seconds` (never speeds it up)"""
+        host = host_key(url_or_host) if '://' in url_or_host else url_or_host.lower()
+        state = self._host(host)
+        if seconds > state.delay:
+            state.delay = seconds
+            state.bucket.set_rate(1.0 / seconds)
+
+    @contextmanager
+    def slot(self, url, deadline=None):
+        """
+        Hold one of the host's connection slots, started no sooner than its pacing allows.
+        With a time.monotonic() deadline, raises DeadlineExceeded instead of waiting past it.
+        """
+        state = self._host(host_key(url))
+        if not state.connections.acquire(timeout=time_left(deadline)):
+            raise DeadlineExceeded(f"No free connection to {host_key(url)} before the deadline")
+        try:
+            wait = state.bucket.reserve()
+            if deadline is not None and time.monotonic() + wait >= deadline:
+                raise DeadlineExceeded(f"Pacing for {host_key(url)} would overrun the deadline")
+            if wait > 0:
+                time.sleep(wait)
+                # Politeness delay, so slow scrapes can be told apart from slow sites
+                record('pacing', wait)
+            yield
+        finally:
+            state.connections.release()
+
+    @staticmethod
+    def _past(deadline, delay):
+        return deadline is not None and time.monotonic() + delay >= deadline
+
+    def backoff_delay(self, attempt, retry_after=None):
+        """Equal-jitter exponential backoff, at least Retry-After when the server sent one"""
+        ceiling = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        delay = ceiling / 2 + random.uniform(0, ceiling / 2)
+        server_delay = _parse_retry_after(retry_after)
+        if server_delay is not None:
+            delay = max(delay, min(server_delay, self.backoff_max))
+        return delay
+
+    def call(self, url, send, deadline=None, max_retries=None):
+        """
+        Run `send()` (one HTTP request returning a requests.Response) in a host
+        slot, retrying connection errors, timeouts and RETRY_STATUSES responses.
+        The last response is returned as-is, the last exception re-raised.
+        No retry is started when its backoff would end past `deadline`
+        (time.monotonic()), see slot(). max_retries overrides the scheduler's own.
+        """
+        state = self._host(host_key(url))
+        if max_retries is None:
+            max_retries = self.max_retries
+        for attempt in range(max_retries + 1):
+            try:
+                with self.slot(url, deadline):
+                    response = send()
+            except requests.exceptions.SSLError:
+                raise
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                delay = self.backoff_delay(attempt)
+                if attempt == max_retries or self._past(deadline, delay):
+                    raise
+                logger.info(f"Retrying {url} in {delay:.1f}s after {type(e).__name__}")
+            else:
+                if response.status_code not in RETRY_STATUSES:
+                    return response
+                delay = self.backoff_delay(attempt, response.headers.get('Retry-After'))
+                if attempt == max_retries or self._past(deadline, delay):
+                    return response
+                response.close()
+                logger.info(f"Retrying {url} in {delay:.1f}s after HTTP {response.status_code}")
+                if response.status_code in (429, 503):
+                    # The whole host is throttling us, not just this request
+                    state.bucket.pause(delay)
+            time.sleep(delay)
+
+def _parse_retry_after(value):
+    """Retry-After in seconds from either delta-seconds or an HTTP date; None if absent/invalid"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+def get_scheduler():
+    """Process-wide scheduler configured from config.ini scraping_settings"""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = PolitenessScheduler(
+                    request_delay=get_setting('scraping_settings', 'request_delay', DEFAULT_REQUEST_DELAY, float),
+                    max_retries=get_setting('scraping_settings', 'max_retries', DEFAULT_MAX_RETRIES, int),
+                    max_connections_per_host=get_setting('scraping_settings', 'max_connections_per_host',
+                                                         DEFAULT_MAX_CONNECTIONS_PER_HOST, int),
+                    burst=get_setting('scraping_settings', 'request_burst', DEFAULT_REQUEST_BURST, int),
+                    backoff_base=get_setting('scraping_settings', 'backoff_base', DEFAULT_BACKOFF_BASE, float),
+                    backoff_max=get_setting('scraping_settings', 'backoff_max', DEFAULT_BACKOFF_MAX, float),
+                )
+    return _scheduler
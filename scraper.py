@@ -1,153 +1,513 @@
 # scraper.py (essential functions only)
-import pandas as pd
-from playwright.sync_api import sync_playwright
+import asyncio
+import json
+import queue
+from collections import deque
 import time
 import re
 
-def scrape_saasquatch(url):
-    """
-    Specialized scraping function for SaaSquatchLeads pricing table
-    """
+from browser_pool import get_browser_pool
+from fetch_strategy import API, browser_fallback_enabled, fetch_tiered, get_strategy_memory
+from http_session import fetch
+from metrics import Trace, stage
+from settings import get_setting
+from render_profile import get_render_profile
+from scheduler import get_scheduler, request_timeout, time_left
+from universal_scraper import DEFAULT_HEADERS, fetch_page
+
+# Extract the pricing table data
+PRICING_TABLE_JS = '''() => {
+    const table = document.querySelector('table.jsx-c15ddf1490db7a4f');
+    if (!table) return null;
+
+    // Extract headers (plan names)
+    const headers = [];
+    const headerCells = table.querySelectorAll('thead th');
+    for (let i = 1; i < headerCells.length; i++) { // Skip the first header (Features)
+        headers.push(headerCells[i].innerText.trim());
+    }
+
+    // Extract features and values
+    const features = [];
+    const rows = table.querySelectorAll('tbody tr');
+
+    rows.forEach(row => {
+        const cells = row.querySelectorAll('td');
+        if (cells.length > 0) {
+            const featureName = cells[0].innerText.trim();
+            const featureValues = [];
+
+            for (let i = 1; i < cells.length; i++) {
+                let value = cells[i].innerText.trim();
+                // Convert checkmarks and dashes to standardized format
+                if (value.includes('✔') || value.includes('✔️')) {
+                    value = '✅';
+                } else if (value.includes('—') || value === '') {
+                    value = '❌';
+                }
+                featureValues.push(value);
+            }
+
+            features.push({
+                'Feature': featureName,
+                ...Object.fromEntries(headers.map((header, idx) => [header, featureValues[idx] || '❌']))
+            });
+        }
+    });
+
+    // Extract prices from footer
+    const footerRows = table.querySelectorAll('tfoot tr');
+    if (footerRows.length >= 2) {
+        const priceCells = footerRows[0].querySelectorAll('td');
+        const priceValues = [];
+
+        for (let i = 1; i < priceCells.length; i++) {
+            priceValues.push(priceCells[i].innerText.trim());
+        }
+
+        features.push({
+            'Feature': 'Price',
+            ...Object.fromEntries(headers.map((header, idx) => [header, priceValues[idx] || 'N/A']))
+        });
+    }
+
+    return features;
+}'''
+
+# Extract contact information if available
+CONTACT_INFO_JS = '''() => {
+    const contacts = {};
+    // Try to find email addresses
+    const emailElements = document.querySelectorAll('a[href^="mailto:"]');
+    if (emailElements.length > 0) {
+        contacts.emails = Array.from(emailElements).map(el => el.href.replace('mailto:', ''));
+    }
+
+    // Try to find phone numbers
+    const phoneRegex = /(\+\d{1,2}\s?)?(\(\d{3}\)|\d{3})[\s.-]?\d{3}[\s.-]?\d{4}/g;
+    const bodyText = document.body.innerText;
+    const phoneMatches = bodyText.match(phoneRegex);
+    if (phoneMatches) {
+        contacts.phones = phoneMatches;
+    }
+
+    return contacts;
+}'''
+
+PRICING_TABLE_SELECTOR = 'table.jsx-c15ddf1490db7a4f'
+
+# --- Pricing from the page's JSON payload ------------------------------------
+# The pricing table is a React/Next component rendered from JSON, either embedded
+# as __NEXT_DATA__ or fetched by an XHR. Reading that JSON gives the same table
+# without waiting for layout or running DOM queries.
+
+NEXT_DATA_RE = re.compile(r'<script[^>]*\bid=["\']__NEXT_DATA__["\'][^>]*>(.*?)</script>', re.IGNORECASE | re.DOTALL)
+
+PLAN_NAME_KEYS = ('name', 'title', 'planName', 'plan', 'label')
+PLAN_PRICE_KEYS = ('price', 'monthlyPrice', 'priceMonthly', 'displayPrice', 'amount', 'cost')
+PLAN_FEATURE_KEYS = ('features', 'featureValues', 'limits', 'items')
+FEATURE_VALUE_KEYS = ('value', 'limit', 'included', 'enabled', 'available')
+
+# Payload nesting deeper than this is not searched for plans
+MAX_PAYLOAD_DEPTH = 12
+
+def navigation_timeout():
+    """Seconds page.goto() may take, from config.ini browser_settings"""
+    return get_setting('browser_settings', 'navigation_timeout', 120, float)
+
+def pricing_extraction_mode():
+    """'auto' (JSON payload when found, rendered table otherwise) or 'dom' (table only)"""
+    return get_setting('fetch_settings', 'pricing_extraction', 'auto')
+
+def extract_next_data(html):
+    """The parsed __NEXT_DATA__ JSON embedded in a Next.js page, or None"""
+    match = NEXT_DATA_RE.search(html)
+    if not match:
+        return None
+    try:
+        return json.loads(match.group(1))
+    except ValueError:
+        return None
+
+def _plan_field(item, keys):
+    for key in keys:
+        value = item.get(key)
+        if value not in (None, ''):
+            return value
+    return None
+
+def _looks_like_plans(node):
+    # A name and a price alone also match product and catalogue lists; plans list what they include
+    return (
+        isinstance(node, list) and len(node) >= 2
+        and all(isinstance(item, dict) and _plan_field(item, PLAN_NAME_KEYS) is not None
+                and _plan_field(item, PLAN_PRICE_KEYS) is not None
+                and isinstance(_plan_field(item, PLAN_FEATURE_KEYS), (list, dict)) for item in node)
+    )
+
+def find_pricing_plans(data):
+    """Breadth-first search of a JSON payload for the shallowest list of plan objects"""
+    pending = deque([(data, 0)])
+    while pending:
+        node, depth = pending.popleft()
+        if _looks_like_plans(node):
+            return node
+        if depth >= MAX_PAYLOAD_DEPTH:
+            continue
+        if isinstance(node, dict):
+            pending.extend((child, depth + 1) for child in node.values())
+        elif isinstance(node, list):
+            pending.extend((child, depth + 1) for child in node)
+    return None
+
+def _format_value(value):
+    # Same markers the DOM extraction produces
+    if value is True:
+        return '✅'
+    if value is False or value is None:
+        return '❌'
+    if isinstance(value, (int, float)):
+        return f"{value:g}"
+    value = str(value).strip()
+    if '✔' in value:
+        return '✅'
+    if '—' in value or value == '':
+        return '❌'
+    return value
+
+def _format_price(value):
+    if isinstance(value, dict):
+        value = _plan_field(value, ('amount', 'value', 'monthly', 'display'))
+    if isinstance(value, (int, float)):
+        return f"${value:g}"
+    return str(value).strip() if value not in (None, '') else 'N/A'
+
+def _iter_plan_features(features):
+    """(feature name, value) pairs from a dict, a list of feature objects or a list of names"""
+    if isinstance(features, dict):
+        yield from features.items()
+    elif isinstance(features, list):
+        for feature in features:
+            if isinstance(feature, dict):
+                name = _plan_field(feature, PLAN_NAME_KEYS + ('feature',))
+                if name is not None:
+                    value = _plan_field(feature, FEATURE_VALUE_KEYS)
+                    yield name, True if value is None else value
+            elif isinstance(feature, str):
+                yield feature, True
+
+def pricing_rows_from_plans(plans):
+    """Plan objects -> the same row dicts as PRICING_TABLE_JS: one per feature, Price last"""
+    headers = [str(_plan_field(plan, PLAN_NAME_KEYS)) for plan in plans]
+
+    feature_values = {}
+    for header, plan in zip(headers, plans):
+        for name, value in _iter_plan_features(_plan_field(plan, PLAN_FEATURE_KEYS)):
+            feature_values.setdefault(str(name), {})[header] = _format_value(value)
+
+    rows = [
+        {'Feature': name, **{header: values.get(header, '❌') for header in headers}}
+        for name, values in feature_values.items()
+    ]
+    rows.append({'Feature': 'Price', **{header: _format_price(_plan_field(plan, PLAN_PRICE_KEYS))
+                                        for header, plan in zip(headers, plans)}})
+    return rows
+
+def _pricing_rows_from_payload(data):
+    plans = find_pricing_plans(data) if data is not None else None
+    return pricing_rows_from_plans(plans) if plans else None
+
+async def _capture_pricing_payload(response, found):
+    """Response listener: resolve `found` with (rows, endpoint) once a pricing payload passes by"""
+    if found.done():
+        return
+    request = response.request
+    try:
+        if request.resource_type == 'document':
+            rows, endpoint = _pricing_rows_from_payload(extract_next_data(await response.text())), None
+        elif request.resource_type in ('xhr', 'fetch') and 'json' in response.headers.get('content-type', ''):
+            rows = _pricing_rows_from_payload(await response.json())
+            # Only a plain GET can be replayed later without the page
+            endpoint = response.url if request.method == 'GET' else None
+        else:
+            return
+    except Exception:
+        return
+    if rows and not found.done():
+        found.set_result((rows, endpoint))
+
+def _dataframe(rows=None):
+    """Pricing rows as a DataFrame; pandas is imported on first use so importing this module stays cheap"""
+    import pandas as pd
+    return pd.DataFrame(rows) if rows is not None else pd.DataFrame()
+
+async def _scrape_saasquatch_page(page, url, profile=None):
+    """Browser-pool job: load the pricing page and read the table and contacts"""
     result_data = {
-        'pricing_data': pd.DataFrame(),
+        'pricing_data': _dataframe(),
         'contact_info': {},
         'error': None
     }
 
+    use_payload = pricing_extraction_mode() != 'dom'
+    found = asyncio.get_running_loop().create_future()
+    if use_payload:
+        page.on('response', lambda response: _capture_pricing_payload(response, found))
+
+    # The lean profile aborts images, fonts, media and trackers, and goto only
+    # waits for the DOM; the selector wait below is what we actually need
+    profile = profile or get_render_profile()
+    await profile.apply(page, url)
+    await page.goto(url, timeout=navigation_timeout() * 1000, wait_until=profile.wait_until)
+
+    # Wait for the pricing table to load, or for its JSON payload if that comes first
+    table_ready = asyncio.ensure_future(page.wait_for_selector(PRICING_TABLE_SELECTOR, timeout=request_timeout() * 1000))
+    if use_payload:
+        await asyncio.wait({found, table_ready}, return_when=asyncio.FIRST_COMPLETED)
+    if found.done():
+        table_ready.cancel()
+        await asyncio.gather(table_ready, return_exceptions=True)
+        rows, endpoint = found.result()
+        result_data['pricing_data'] = _dataframe(rows)
+        result_data['data_endpoint'] = endpoint
+        # The DOM is loaded by now; history rows expect the page's contacts either way
+        result_data['contact_info'] = await page.evaluate(CONTACT_INFO_JS)
+        return result_data
+    found.cancel()
+    await table_ready
+
+    pricing_data = await page.evaluate(PRICING_TABLE_JS)
+
+    if pricing_data:
+        result_data['pricing_data'] = _dataframe(pricing_data)
+        result_data['contact_info'] = await page.evaluate(CONTACT_INFO_JS)
+
+    return result_data
+
+def _pricing_error(message):
+    return {
+        'pricing_data': _dataframe(),
+        'contact_info': {},
+        'error': message
+    }
+
+def scrape_saasquatch(url, pool=None, profile=None):
+    """
+    Specialized scraping function for SaaSquatchLeads pricing table.
+    Runs on the shared browser pool, so only the first call pays for browser startup.
+    """
     try:
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            page = browser.new_page()
-            
-            # Set longer timeout and wait for page to load
-            page.goto(url, timeout=120000, wait_until='networkidle')
-            
-            # Wait for the pricing table to load
-            page.wait_for_selector('table.jsx-c15ddf1490db7a4f', timeout=30000)
-            
-            # Extract the pricing table data
-            pricing_data = page.evaluate('''() => {
-                const table = document.querySelector('table.jsx-c15ddf1490db7a4f');
-                if (!table) return null;
-                
-                // Extract headers (plan names)
-                const headers = [];
-                const headerCells = table.querySelectorAll('thead th');
-                for (let i = 1; i < headerCells.length; i++) { // Skip the first header (Features)
-                    headers.push(headerCells[i].innerText.trim());
-                }
-                
-                // Extract features and values
-                const features = [];
-                const rows = table.querySelectorAll('tbody tr');
-                
-                rows.forEach(row => {
-                    const cells = row.querySelectorAll('td');
-                    if (cells.length > 0) {
-                        const featureName = cells[0].innerText.trim();
-                        const featureValues = [];
-                        
-                        for (let i = 1; i < cells.length; i++) {
-                            let value = cells[i].innerText.trim();
-                            // Convert checkmarks and dashes to standardized format
-                            if (value.includes('✔') || value.includes('✔️')) {
-                                value = '✅';
-                            } else if (value.includes('—') || value === '') {
-                                value = '❌';
-                            }
-                            featureValues.push(value);
-                        }
-                        
-                        features.push({
-                            'Feature': featureName,
-                            ...Object.fromEntries(headers.map((header, idx) => [header, featureValues[idx] || '❌']))
-                        });
-                    }
-                });
-                
-                // Extract prices from footer
-                const footerRows = table.querySelectorAll('tfoot tr');
-                if (footerRows.length >= 2) {
-                    const priceCells = footerRows[0].querySelectorAll('td');
-                    const priceValues = [];
-                    
-                    for (let i = 1; i < priceCells.length; i++) {
-                        priceValues.push(priceCells[i].innerText.trim());
-                    }
-                    
-                    features.push({
-                        'Feature': 'Price',
-                        ...Object.fromEntries(headers.map((header, idx) => [header, priceValues[idx] || 'N/A']))
-                    });
-                }
-                
-                return features;
-            }''')
-            
-            if pricing_data:
-                result_data['pricing_data'] = pd.DataFrame(pricing_data)
-                
-                # Extract contact information if available
-                contact_info = page.evaluate('''() => {
-                    const contacts = {};
-                    // Try to find email addresses
-                    const emailElements = document.querySelectorAll('a[href^="mailto:"]');
-                    if (emailElements.length > 0) {
-                        contacts.emails = Array.from(emailElements).map(el => el.href.replace('mailto:', ''));
-                    }
-                    
-                    // Try to find phone numbers
-                    const phoneRegex = /(\+\d{1,2}\s?)?(\(\d{3}\)|\d{3})[\s.-]?\d{3}[\s.-]?\d{4}/g;
-                    const bodyText = document.body.innerText;
-                    const phoneMatches = bodyText.match(phoneRegex);
-                    if (phoneMatches) {
-                        contacts.phones = phoneMatches;
-                    }
-                    
-                    return contacts;
-                }''')
-                
-                result_data['contact_info'] = contact_info
-            
-            browser.close()
-            
+        return (pool or get_browser_pool()).run(_scrape_saasquatch_page, url, profile)
     except Exception as e:
-        result_data['error'] = f"Error scraping SaaSquatchLeads: {str(e)}"
-    
-    return result_data
+        return _pricing_error(f"Error scraping SaaSquatchLeads: {str(e)}")
 
 
-# Also update the app.py to use this specialized function for SaaSquatchLeads
-# Add this function to your app.py file:
+DEFAULT_PAGE_TIMEOUT = 60
 
-def scrape_pricing_data(url):
+async def _render_pricing_page(pool, url, profile, timeout):
+    # Covers the wait for a free browser context (and a browser launch) as well as the render
+    return await asyncio.wait_for(pool.run_async(_scrape_saasquatch_page, url, profile), timeout)
+
+PHONE_NUMBER_RE = re.compile(r'(\+\d{1,2}\s?)?(\(\d{3}\)|\d{3})[\s.-]?\d{3}[\s.-]?\d{4}')
+
+def _cell_text(cell):
+    return cell.get_text(' ', strip=True)
+
+def parse_pricing_table(soup):
     """
-    Scrapes pricing data from websites, with special handling for SaaSquatchLeads
+    Python port of PRICING_TABLE_JS for pages that server-render the table.
+    Returns the same list of row dicts, or None when the table is missing.
     """
-    # Special handling for SaaSquatchLeads
-    if 'saasquatchleads.com' in url:
-        return scrape_saasquatch(url)
-    
-    # Generic scraping for other websites
+    table = soup.select_one(PRICING_TABLE_SELECTOR)
+    if table is None:
+        return None
+
+    # Skip the first header (Features)
+    headers = [_cell_text(th) for th in table.select('thead th')[1:]]
+
+    features = []
+    for row in table.select('tbody tr'):
+        cells = row.find_all('td')
+        if not cells:
+            continue
+        feature_values = []
+        for cell in cells[1:]:
+            value = _cell_text(cell)
+            # Convert checkmarks and dashes to standardized format
+            if '✔' in value:
+                value = '✅'
+            elif '—' in value or value == '':
+                value = '❌'
+            feature_values.append(value)
+        feature = {'Feature': _cell_text(cells[0])}
+        feature.update({header: feature_values[idx] if idx < len(feature_values) else '❌'
+                        for idx, header in enumerate(headers)})
+        features.append(feature)
+
+    # Extract prices from footer
+    footer_rows = table.select('tfoot tr')
+    if len(footer_rows) >= 2:
+        price_values = [_cell_text(td) for td in footer_rows[0].find_all('td')[1:]]
+        feature = {'Feature': 'Price'}
+        feature.update({header: (price_values[idx] if idx < len(price_values) else '') or 'N/A'
+                        for idx, header in enumerate(headers)})
+        features.append(feature)
+
+    return features
+
+def _static_contact_info(document):
+    """Same keys as CONTACT_INFO_JS, read from the static HTML"""
+    contacts = {}
+    emails = [href.strip()[len('mailto:'):] for href in document.links.hrefs if href.strip().startswith('mailto:')]
+    if emails:
+        contacts['emails'] = emails
+    body = document.soup.body or document.soup
+    phones = [match.group(0) for match in PHONE_NUMBER_RE.finditer(body.get_text('\n'))]
+    if phones:
+        contacts['phones'] = phones
+    return contacts
+
+def _scrape_pricing_static(url, timeout=DEFAULT_PAGE_TIMEOUT, deadline=None):
+    """Plain HTTP fetch; enough whenever the pricing table is in the server-rendered HTML"""
+    document = fetch_page(url, timeout=timeout, deadline=deadline)
+    with stage('pricing_parse'):
+        pricing_data = None
+        if pricing_extraction_mode() != 'dom':
+            pricing_data = _pricing_rows_from_payload(extract_next_data(document.text))
+        if not pricing_data:
+            pricing_data = parse_pricing_table(document.soup)
+    if not pricing_data:
+        return _pricing_error("Pricing table not found in the static HTML")
+    return {
+        'pricing_data': _dataframe(pricing_data),
+        'contact_info': _static_contact_info(document),
+        'error': None
+    }
+
+def _scrape_pricing_api(endpoint, timeout=DEFAULT_PAGE_TIMEOUT, deadline=None):
+    """Request a remembered pricing data endpoint directly, no page or browser involved"""
+    response = fetch(endpoint, headers={**DEFAULT_HEADERS, 'Accept': 'application/json'}, timeout=timeout,
+                     deadline=deadline)
+    response.raise_for_status()
+    rows = _pricing_rows_from_payload(response.json())
+    if not rows:
+        return _pricing_error("No pricing plans in the data endpoint response")
+    return {
+        'pricing_data': _dataframe(rows),
+        'contact_info': {},
+        'error': None,
+        'data_endpoint': endpoint
+    }
+
+def _has_pricing_data(result):
+    return not result['pricing_data'].empty
+
+def scrape_pricing(url, pool=None, profile=None, page_timeout=DEFAULT_PAGE_TIMEOUT):
+    """
+    Tiered pricing scrape: a static fetch first, the headless browser only when
+    the table is not in the HTML. The winning strategy is remembered per domain
+    and reported in result['fetch_strategy'].
+
+    When a render found the pricing JSON in an XHR, that endpoint is remembered
+    and later runs request it directly before trying any other tier. With
+    metrics enabled, per-stage timings are added as result['timings'].
+
+    page_timeout bounds the whole call: every tier, scheduler retries and
+    pacing, and the wait for a free browser context share one deadline.
+    """
+    deadline = time.monotonic() + page_timeout
+    with Trace() as timings:
+        result = _scrape_pricing_tiers(url, pool, profile, page_timeout, deadline)
+    if timings:
+        result['timings'] = timings
+    return result
+
+def _scrape_pricing_tiers(url, pool, profile, page_timeout, deadline):
+    memory = get_strategy_memory()
+    endpoint = memory.details_for(url).get('endpoint') if pricing_extraction_mode() != 'dom' else None
+    if endpoint:
+        try:
+            result = _scrape_pricing_api(endpoint, timeout=page_timeout, deadline=deadline)
+            if _has_pricing_data(result):
+                result['fetch_strategy'] = API
+                return result
+        except Exception:
+            pass
+
+    def render(page_url):
+        # One render counts as one request against the host's pacing
+        with get_scheduler().slot(page_url, deadline), stage('render'):
+            browser_pool = pool or get_browser_pool()
+            return browser_pool.call(_render_pricing_page, browser_pool, page_url, profile,
+                                     time_left(deadline)).result()
+
+    browser_fetch = render if browser_fallback_enabled() else None
+
+    def static_fetch(page_url):
+        return _scrape_pricing_static(page_url, timeout=page_timeout, deadline=deadline)
+
     try:
-        # This is a placeholder - implement actual scraping logic for other sites
-        # For demonstration, returning sample data
-        sample_data = {
-            'Feature': ['Monthly Leads', 'Lead Scraping', 'Export to CSV', 'Price'],
-            'Free': ['5', '❌', '❌', '$0/mo'],
-            'Bronze': ['50', '✅', '✅', '$19/mo'],
-            'Silver': ['125', '✅', '✅', '$49/mo'],
-            'Gold': ['292', '✅', '✅', '$99/mo'],
-            'Platinum': ['Unlimited', '✅', '✅', '$199/mo'],
-            'Custom': ['Custom', '✅', '✅', 'Custom']
-        }
-        
-        return {
-            'pricing_data': pd.DataFrame(sample_data),
-            'error': None
-        }
+        result, strategy = fetch_tiered(url, static_fetch, browser_fetch, _has_pricing_data)
+    except (asyncio.TimeoutError, TimeoutError):
+        return _pricing_error(f"Timed out after {page_timeout}s")
     except Exception as e:
-        return {
-            'pricing_data': pd.DataFrame(),
-            'error': f'Error scraping pricing data: {str(e)}'
-        }
+        return _pricing_error(f"Error scraping pricing page: {str(e)}")
+    if result.get('data_endpoint') and _has_pricing_data(result):
+        memory.remember(url, API, endpoint=result['data_endpoint'])
+    result['fetch_strategy'] = strategy
+    return result
+
+async def _scrape_one_pricing_page(pool, semaphore, url, profile, page_timeout):
+    async with semaphore:
+        # The tiered scrape blocks on the static fetch, so it runs on a worker thread;
+        # only pages that need rendering come back to this loop as browser jobs
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(None, scrape_pricing, url, pool, profile, page_timeout)
+    return url, result
+
+async def scrape_pricing_pages_async(urls, pool=None, max_concurrency=4, page_timeout=DEFAULT_PAGE_TIMEOUT,
+                                     profile=None, on_result=None):
+    """
+    Scrape many pricing pages at once, rendering in the pool's single browser
+    only the pages whose table is not in the static HTML (see scrape_pricing).
+
+    Must run on the pool's event loop (pool.call(scrape_pricing_pages_async, ...)).
+    At most max_concurrency pages are in flight (renders are further capped by
+    the pool's max_contexts) and each page gets page_timeout seconds. on_result(url, result)
+    is called as each page finishes. Returns {url: result} in the same shape as
+    scrape_saasquatch.
+    """
+    pool = pool or get_browser_pool()
+    semaphore = asyncio.Semaphore(max(1, int(max_concurrency)))
+    tasks = [
+        asyncio.ensure_future(_scrape_one_pricing_page(pool, semaphore, url, profile, page_timeout))
+        for url in dict.fromkeys(urls)
+    ]
+    results = {}
+    for finished in asyncio.as_completed(tasks):
+        url, result = await finished
+        results[url] = result
+        if on_result is not None:
+            on_result(url, result)
+    return results
+
+def iter_pricing_pages(urls, pool=None, max_concurrency=4, page_timeout=DEFAULT_PAGE_TIMEOUT, profile=None):
+    """Synchronous front end for scrape_pricing_pages_async: yield (url, result) as pages finish"""
+    pool = pool or get_browser_pool()
+    urls = list(dict.fromkeys(urls))
+    finished = queue.Queue()
+    future = pool.call(scrape_pricing_pages_async, urls, pool, max_concurrency, page_timeout, profile,
+                       on_result=lambda url, result: finished.put((url, result)))
+
+    remaining = len(urls)
+    while remaining:
+        try:
+            url, result = finished.get(timeout=0.5)
+        except queue.Empty:
+            if future.done():
+                # Surfaces an unexpected failure instead of waiting forever
+                future.result()
+                return
+            continue
+        remaining -= 1
+        yield url, result
@@ -0,0 +1,36 @@
+# settings.py
+import configparser
+import os
+import threading
+
+CONFIG_FILE = "config.ini"
+
+_config = None
+_config_lock = threading.Lock()
+
+def get_config():
+    """Load config.ini once and share the parsed result across the process"""
+    global _config
+    if _config is None:
+        with _config_lock:
+            if _config is None:
+                config = configparser.ConfigParser()
+                if os.path.exists(CONFIG_FILE):
+                    config.read(CONFIG_FILE, encoding='utf-8')
+                _config = config
+    return _config
+
+def get_setting(section, option, fallback=None, cast=str):
+    """
+    Read one value from config.ini, falling back when the section/option is missing
+    or cannot be converted with `cast` (str, int, float or bool)
+    """
+    config = get_config()
+    if not config.has_option(section, option):
+        return fallback
+    try:
+        if cast is bool:
+            return config.getboolean(section, option)
+        return cast(config.get(section, option))
+    except ValueError:
+        return fallback
@@ -0,0 +1,59 @@
+# text_regions.py
+import html
+import re
+
+from settings import get_setting
+
+# Scan modes for the contact extractors (scraping_settings.scan_mode)
+VISIBLE_SCAN = 'visible'
+RAW_SCAN = 'raw'
+
+# Blocks a reader never sees; inline JSON state, scripts and SVG paths make up
+# most of an SPA page and are where the digit-heavy false phone hits come from
+NON_VISIBLE_BLOCK_RE = re.compile(
+    r'<(script|style|svg|noscript|template)\b.*?</\1\s*>|<!--.*?-->', re.IGNORECASE | re.DOTALL)
+# Tags that start a new line when rendered; every other tag (span, b, a, ...) is
+# inline and is dropped without a break, so info@<span>acme</span>.com stays whole
+BLOCK_TAG_RE = re.compile(
+    r'</?(?:p|div|br|hr|li|ul|ol|dl|dt|dd|table|thead|tbody|tfoot|tr|td|th|caption|h[1-6]|'
+    r'section|article|header|footer|nav|aside|main|address|blockquote|pre|figure|figcaption|'
+    r'form|fieldset|legend|option|title|head|body|html)\b[^>]*>', re.IGNORECASE)
+TAG_RE = re.compile(r'<[^>]+>')
+# Collapse the whitespace left behind by removed tags, keeping line breaks so
+# text from neighbouring cells is never glued into one number
+BLANK_RUN_RE = re.compile(r'[ \t\r\f\v]*\n\s*')
+WHITESPACE_RE = re.compile(r'\s+')
+
+def scan_mode():
+    """'visible' (default) or 'raw' from config.ini"""
+    mode = get_setting('scraping_settings', 'scan_mode', VISIBLE_SCAN).lower()
+    return mode if mode in (VISIBLE_SCAN, RAW_SCAN) else VISIBLE_SCAN
+
+def visible_text(text):
+    """The text of an HTML str without tags, script/style/svg blocks or comments, entities decoded"""
+    text = NON_VISIBLE_BLOCK_RE.sub('\n', text)
+    text = BLOCK_TAG_RE.sub('\n', text)
+    text = TAG_RE.sub('', text)
+    return html.unescape(BLANK_RUN_RE.sub('\n', text)).strip()
+
+class TextRegions:
+    """
+    The two small buffers the extractors scan instead of the raw HTML.
+
+    `visible` is the page text a reader sees; `attributes` holds the href and
+    <meta content> values (mailto:, tel: and social links live there), taken
+    from the already parsed links rather than another pass over the HTML.
+    """
+
+    def __init__(self, text, links):
+        self.visible = visible_text(text)
+        self.attributes = '\n'.join(links.hrefs + links.meta_contents)
+
+    @property
+    def scan_text(self):
+        return f"{self.visible}\n{self.attributes}"
+
+    @property
+    def visible_chars(self):
+        """Non-whitespace characters of the visible text"""
+        return len(WHITESPACE_RE.sub('', self.visible))
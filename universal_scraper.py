@@ -1,145 +1,157 @@
-import requests
-from bs4 import BeautifulSoup
-import re
-import json
-import os
+import logging
+import time
 from urllib.parse import urlparse, urljoin
 from datetime import datetime
-import warnings
-from requests.packages.urllib3.exceptions import InsecureRequestWarning
-import ssl
-import certifi
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 
-# Suppress only the single warning from urllib3 needed
-warnings.filterwarnings('ignore', category=InsecureRequestWarning)
+from contact_extractor import extract_contacts
+from fetch_strategy import browser_fallback_enabled, fetch_tiered, get_min_text_chars, render_document
+from html_document import HtmlDocument
+from http_cache import get_http_cache
+from http_session import DEFAULT_HEADERS, fetch_html
+from metrics import Trace, count, stage
+from robots_policy import RobotsUnreachable, robots_allowed
+from scheduler import get_scheduler, host_key, request_timeout
+from text_regions import scan_mode
+
+logger = logging.getLogger(__name__)
+
+# Bump when extraction changes what it returns for the same page, so cached results are redone
+EXTRACTOR_VERSION = 4
+
+def fetch_page(url, timeout=None, deadline=None):
+    """
+    Fetch one page through the shared pooled session and fail on HTTP errors.
+    Non-HTML responses raise SkippedContent; bodies past max_body_kb are cut off.
+    """
+    # Shared pooled session; SSL fallback is decided once per host
+    response, content, _ = fetch_html(url, headers=DEFAULT_HEADERS, timeout=timeout, deadline=deadline)
+    response.raise_for_status()
+    # Decode the body once; response.text would re-decode it on every access
+    return HtmlDocument(response.url, content, response.headers.get('Content-Type', ''))
+
+def extract_contact_data(document, scan_mode=None):
+    """
+    Extract emails, phone numbers and social media links from a fetched page.
+    Only its visible text and link attributes are scanned unless scan_mode is 'raw'.
+    """
+    scan_text = document.scan_text(scan_mode)
+    links = document.links
+    with stage('extract'):
+        emails, phones, social_links = extract_contacts(scan_text, links)
+    count('scraper_matches_total', len(emails), kind='email')
+    count('scraper_matches_total', len(phones), kind='phone')
+    count('scraper_matches_total', len(social_links), kind='social')
+    return emails, phones, social_links
+
+def _extract_page(document):
+    """Extraction result for one page, in the JSON-friendly shape stored in the HTTP cache"""
+    emails, phones, social_links = extract_contact_data(document)
+
+    links = []
+    for href, link_text in document.links.anchors:
+        link_url = _normalize_link(document.url, href)
+        if link_url:
+            links.append([link_url, link_text])
+
+    return {
+        'url': document.url,
+        'emails': emails,
+        'phones': phones,
+        'social_links': social_links,
+        'links': links,
+        'text_chars': document.regions.visible_chars
+    }
+
+def _result_version():
+    """Stored with every cached result; a result made by another extractor or scan mode is not reused"""
+    return f"{EXTRACTOR_VERSION}:{scan_mode()}"
+
+def scrape_page(url, timeout=None):
+    """
+    Fetch and extract one page, going through the on-disk HTTP cache when enabled.
+
+    A fresh cache entry (inside its domain TTL) is returned without any request.
+    A stale one is revalidated with If-None-Match / If-Modified-Since, and on
+    304 Not Modified the stored extraction result is reused as-is. A result
+    stored by another EXTRACTOR_VERSION or scan_mode is redone from the
+    cached body.
+
+    The body is streamed: non-HTML responses are skipped before download and
+    at most max_body_kb is read, so a huge page is extracted from its prefix.
+    """
+    cache = get_http_cache()
+    result_version = _result_version()
+    entry = cache.lookup(url, result_version) if cache else None
+    if entry is not None and entry.is_fresh():
+        if entry.result is not None:
+            return entry.result
+        # Still fresh, only the extraction is outdated: no request needed
+        document = HtmlDocument(entry.url, entry.load_body(), entry.content_type)
+        page = _extract_page(document)
+        cache.store_result(entry, page, result_version)
+        return page
+
+    headers = dict(DEFAULT_HEADERS)
+    if entry is not None:
+        headers.update(entry.conditional_headers())
+
+    # Shared pooled session; SSL fallback is decided once per host
+    response, content, truncated = fetch_html(url, headers=headers, timeout=timeout)
+
+    if response.status_code == 304 and entry is not None:
+        cache.revalidated(entry, response.headers)
+        if entry.result is not None:
+            return entry.result
+        # Body is still valid but was stored without a result: extract it once now
+        store_headers = {
+            'ETag': response.headers.get('ETag') or entry.etag,
+            'Last-Modified': response.headers.get('Last-Modified') or entry.last_modified,
+            'Content-Type': entry.content_type
+        }
+        document = HtmlDocument(entry.url, entry.load_body(), entry.content_type)
+    else:
+        response.raise_for_status()
+        store_headers = response.headers
+        document = HtmlDocument(response.url, content, response.headers.get('Content-Type', ''))
+        if truncated:
+            logger.info(f"{url} is larger than max_body_kb; extracting from the first {len(content)} bytes")
+
+    page = _extract_page(document)
+    if cache is not None:
+        cache.store(url, store_headers, document.content, page, result_version)
+    return page
+
+def _render_page(url, timeout=None):
+    """Browser fallback for pages whose content only appears after JavaScript runs"""
+    # One render counts as one request against the host's pacing
+    with get_scheduler().slot(url):
+        with stage('render'):
+            document = render_document(url, timeout=timeout)
+        return _extract_page(document)
+
+def _has_contact_data(page):
+    # Results cached before text_chars existed were accepted back then; keep accepting them
+    return bool(page['emails']) or page.get('text_chars', get_min_text_chars()) >= get_min_text_chars()
+
+def scrape_page_tiered(url, timeout=None):
+    """
+    scrape_page, escalating to a headless-browser render only when the static
+    HTML has no email and too little text (a JS-only site). The winning
+    strategy is remembered per domain; returns (page, strategy).
+    """
+    browser_fetch = (lambda u: _render_page(u, timeout=timeout)) if browser_fallback_enabled() else None
+    return fetch_tiered(url, lambda u: scrape_page(u, timeout=timeout), browser_fetch, _has_contact_data)
 
 def scrape_universal_contact(url):
     """
     Scrape contact information from any website
     """
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        
-        # Coba dengan certificate bundle yang benar terlebih dahulu
-        try:
-            response = requests.get(url, headers=headers, timeout=30, verify=certifi.where())
-            response.raise_for_status()
-        except requests.exceptions.SSLError:
-            # Fallback ke verify=False jika certificate bundle tidak bekerja
-            response = requests.get(url, headers=headers, timeout=30, verify=False)
-            response.raise_for_status()
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Extract emails - pattern sudah benar
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        emails = re.findall(email_pattern, response.text)
-        emails = list(set(emails))  # Remove duplicates
-        
-        # Extract phone numbers - PERBAIKI PATTERN UNTUK KODE AREA
-        phone_patterns = [
-            # Format internasional: +xx xxxx xxxx, +xx xxxx xxxx, +xx (0) xxxx xxxx
-            r'\+\d{1,3}[\s\-]?\(?\d{1,4}\)?[\s\-]?\d{1,4}[\s\-]?\d{1,4}[\s\-]?\d{1,9}',
-            # Format dengan kode area: (021) 123-4567, 021-123-4567, 021.123.4567
-            r'\(?(\d{2,4})\)?[\s\-.]?(\d{3,4})[\s\-.]?(\d{3,4})',
-            # Format tanpa kode area (minimal 7 digit): 123-4567, 1234567
-            r'\b\d{3}[\s\-.]?\d{4}\b',
-            # Format dengan kata "tel", "phone", atau "call"
-            r'(?:tel|phone|call|telepon)[\s::\-]+\(?([\+]?\d{1,3}[\s\-]?\(?\d{1,4}\)?[\s\-]?\d{1,4}[\s\-]?\d{1,4}[\s\-]?\d{1,9})\)?',
-        ]
-        
-        phones = []
-        for pattern in phone_patterns:
-            found_phones = re.finditer(pattern, response.text, re.IGNORECASE)
-            for match in found_phones:
-                # Ambil seluruh match atau group pertama jika ada grouping
-                if match.groups():
-                    phone = ''.join([g for g in match.groups() if g])
-                else:
-                    phone = match.group(0)
-                phones.append(phone)
-        
-        # Bersihkan dan format nomor telepon
-        cleaned_phones = []
-        for phone in phones:
-            # Hapus karakter non-digit kecuali tanda +
-            cleaned_phone = re.sub(r'[^\d+]', '', phone)
-            
-            # Validasi panjang nomor (minimal 7 digit, maksimal 16 digit)
-            if 7 <= len(cleaned_phone.replace('+', '')) <= 16:
-                # Format yang lebih rapi
-                if cleaned_phone.startswith('+'):
-                    # Format internasional: +XX XXX XXX XXXX
-                    digits = cleaned_phone.replace('+', '')
-                    formatted_phone = f"+{digits[:2]} {digits[2:5]} {digits[5:8]} {digits[8:]}"
-                else:
-                    # Format lokal dengan kode area
-                    if len(cleaned_phone) >= 10:
-                        # Format: XXX-XXXX-XXXX atau XX-XXXX-XXXX
-                        kode_area = cleaned_phone[:3] if len(cleaned_phone) >= 11 else cleaned_phone[:2]
-                        nomor = cleaned_phone[len(kode_area):]
-                        
-                        if len(nomor) == 7:
-                            formatted_phone = f"{kode_area}-{nomor[:3]}-{nomor[3:]}"
-                        elif len(nomor) == 8:
-                            formatted_phone = f"{kode_area}-{nomor[:4]}-{nomor[4:]}"
-                        else:
-                            formatted_phone = f"{kode_area}-{nomor}"
-                    else:
-                        # Format tanpa kode area: XXX-XXXX
-                        formatted_phone = f"{cleaned_phone[:3]}-{cleaned_phone[3:]}"
-                
-                cleaned_phones.append(formatted_phone.strip())
-        
-        phones = list(set(cleaned_phones))  # Remove duplicates
-        
-        # Extract social media links
-        social_links = {}
-        social_patterns = {
-            'facebook': r'https?://(www\.)?facebook\.com/[A-Za-z0-9_.-]+',
-            'twitter': r'https?://(www\.)?twitter\.com/[A-Za-z0-9_]+',
-            'linkedin': r'https?://(www\.)?linkedin\.com/(company|in)/[A-Za-z0-9_.-]+',
-            'instagram': r'https?://(www\.)?instagram\.com/[A-Za-z0-9_.-]+',
-            'youtube': r'https?://(www\.)?youtube\.com/(channel/|user/|@)[A-Za-z0-9_.-]+',
-            'whatsapp': r'https?://(wa\.me|api\.whatsapp\.com)/[\d+]+'
-        }
-        
-        for platform, pattern in social_patterns.items():
-            matches = re.finditer(pattern, response.text, re.IGNORECASE)
-            for match in matches:
-                link = match.group(0)
-                # Pastikan link tidak mengandung karakter yang tidak diinginkan
-                if '"' in link or "'" in link or '>' in link or '<' in link:
-                    link = re.split(r'["\'<>]', link)[0]
-                
-                if platform not in social_links:
-                    social_links[platform] = link
-                elif link not in social_links.values():
-                    # Jika platform sudah ada, tambahkan dengan angka
-                    count = 1
-                    while f"{platform}_{count}" in social_links:
-                        count += 1
-                    social_links[f"{platform}_{count}"] = link
-        
-        # Cari juga di tag meta dan link
-        for meta in soup.find_all('meta', content=True):
-            content = meta.get('content', '')
-            for platform, pattern in social_patterns.items():
-                if re.search(pattern, content, re.IGNORECASE):
-                    match = re.search(pattern, content, re.IGNORECASE)
-                    if match:
-                        link = match.group(0)
-                        if platform not in social_links:
-                            social_links[platform] = link
-        
-        for link_tag in soup.find_all('a', href=True):
-            href = link_tag['href']
-            for platform, pattern in social_patterns.items():
-                if re.search(pattern, href, re.IGNORECASE):
-                    if platform not in social_links:
-                        social_links[platform] = href
+        with Trace() as timings:
+            page, strategy = scrape_page_tiered(url)
+        emails, phones, social_links = page['emails'], page['phones'], page['social_links']
         
         # Get website name from URL
         parsed_url = urlparse(url)
@@ -153,16 +165,247 @@ def scrape_universal_contact(url):
             'phones': phones,
             'social_links': social_links,
             'timestamp': datetime.now().isoformat(),
-            'scraper_type': 'universal'
+            'scraper_type': 'universal',
+            'fetch_strategy': strategy
         }
+        if timings:
+            result['timings'] = timings
         
         return result
         
     except Exception as e:
         return {'error': f'Failed to scrape website: {str(e)}'}
 
+# Kata kunci untuk menilai seberapa mungkin sebuah link berisi informasi kontak
+CONTACT_LINK_KEYWORDS = {
+    'contact': 10, 'kontak': 10, 'hubungi': 10, 'impressum': 9, 'imprint': 9,
+    'about': 6, 'tentang': 6, 'team': 4, 'support': 4, 'help': 3,
+    'company': 3, 'office': 3, 'location': 3, 'legal': 2, 'privacy': 1,
+}
+
+SKIPPED_LINK_EXTENSIONS = (
+    '.pdf', '.jpg', '.jpeg', '.png', '.gif', '.svg', '.webp', '.ico', '.css', '.js',
+    '.zip', '.gz', '.mp4', '.mp3', '.avi', '.mov', '.doc', '.docx', '.xls', '.xlsx',
+)
+
+def _site_key(netloc):
+    """Treat www.example.com and example.com as the same site"""
+    netloc = netloc.lower()
+    return netloc[4:] if netloc.startswith('www.') else netloc
+
+def _normalize_link(base_url, href):
+    """Resolve a link against its page and drop fragments; None if not crawlable"""
+    absolute = urljoin(base_url, href.strip())
+    parsed = urlparse(absolute)
+    if parsed.scheme not in ('http', 'https'):
+        return None
+    if parsed.path.lower().endswith(SKIPPED_LINK_EXTENSIONS):
+        return None
+    return parsed._replace(fragment='').geturl()
+
+def _contact_score(link_url, link_text):
+    """Rank a link by how likely it is to lead to contact details"""
+    haystack = f"{urlparse(link_url).path} {link_text}".lower()
+    score = sum(weight for keyword, weight in CONTACT_LINK_KEYWORDS.items() if keyword in haystack)
+    # Prefer shallow pages when the keywords tie
+    return score - urlparse(link_url).path.count('/') * 0.1
+
+def _merge_social_links(merged, social_links):
+    """Merge one page's social links into the crawl result without repeating a link"""
+    for platform, link in social_links.items():
+        if link in merged.values():
+            continue
+        base_platform = platform.split('_')[0]
+        if base_platform not in merged:
+            merged[base_platform] = link
+        else:
+            count = 1
+            while f"{base_platform}_{count}" in merged:
+                count += 1
+            merged[f"{base_platform}_{count}"] = link
+
+def _crawl_page(url, timeout):
+    """Fetch and extract a single page of a crawl; returns (emails, phones, social_links, links, timings)"""
+    with Trace() as timings:
+        page, _ = scrape_page_tiered(url, timeout=timeout)
+    return page['emails'], page['phones'], page['social_links'], page['links'], timings
+
+def crawl_universal_contact(url, max_depth=2, max_pages=10, time_limit=20, max_workers=4):
+    """
+    Crawl a website starting at its landing page and merge contact information
+    from every visited page into one record.
+
+    Same-site links are followed best-first by contact-likeness (/contact, /about,
+    /impressum, ...). The crawl stops at `max_depth` link hops, `max_pages` fetched
+    pages or `time_limit` seconds, whichever comes first. Pages of one depth level
+    are fetched concurrently over the shared keep-alive session. Pages that
+    robots.txt disallows are never fetched.
+    """
+    try:
+        if not robots_allowed(url):
+            return {'error': 'Failed to scrape website: disallowed by robots.txt'}
+    except RobotsUnreachable as e:
+        return {'error': f'Failed to scrape website: {str(e)}'}
+
+    deadline = time.monotonic() + time_limit
+    site = _site_key(urlparse(url).netloc)
+
+    emails, phones, social_links = set(), set(), {}
+    # Stage timings summed over every crawled page (empty with metrics disabled)
+    timings = {}
+    pages_crawled = []
+    seen = {_normalize_link(url, url) or url}
+    frontier = [(url, 0)]
+    first_error = None
+
+    executor = ThreadPoolExecutor(max_workers=max(1, int(max_workers)))
+    try:
+        while frontier and len(pages_crawled) < max_pages and time.monotonic() < deadline:
+            batch = frontier[:max_pages - len(pages_crawled)]
+            frontier = []
+            page_timeout = min(request_timeout(), max(1, deadline - time.monotonic()))
+            futures = {executor.submit(_crawl_page, page_url, page_timeout): (page_url, depth) for page_url, depth in batch}
+
+            done, not_done = wait(futures, timeout=max(0, deadline - time.monotonic()))
+            for future in not_done:
+                future.cancel()
+
+            candidates = {}
+            for future in done:
+                page_url, depth = futures[future]
+                try:
+                    page_emails, page_phones, page_social, links, page_timings = future.result()
+                except Exception as e:
+                    if first_error is None:
+                        first_error = e
+                    continue
+
+                pages_crawled.append(page_url)
+                emails.update(page_emails)
+                phones.update(page_phones)
+                _merge_social_links(social_links, page_social)
+                for name, ms in page_timings.items():
+                    timings[name] = round(timings.get(name, 0.0) + ms, 2)
+
+                if depth >= max_depth:
+                    continue
+                for link_url, link_text in links:
+                    if link_url in seen or _site_key(urlparse(link_url).netloc) != site:
+                        continue
+                    try:
+                        link_allowed = robots_allowed(link_url)
+                    except RobotsUnreachable:
+                        # The site stopped answering mid-crawl; its other pages would fail too
+                        link_allowed = False
+                    if not link_allowed:
+                        seen.add(link_url)
+                        continue
+                    score = _contact_score(link_url, link_text)
+                    if score > candidates.get(link_url, (float('-inf'),))[0]:
+                        candidates[link_url] = (score, depth + 1)
+
+            ranked = sorted(candidates.items(), key=lambda item: item[1][0], reverse=True)
+            for link_url, (_, depth) in ranked:
+                seen.add(link_url)
+                frontier.append((link_url, depth))
+    finally:
+        # Don't let pages that overran the time limit hold up the result
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    if not pages_crawled:
+        return {'error': f'Failed to scrape website: {str(first_error) if first_error else "crawl time limit reached"}'}
+
+    result = {
+        'website': urlparse(url).netloc,
+        'url': url,
+        'emails': list(emails),
+        'phones': list(phones),
+        'social_links': social_links,
+        'pages_crawled': pages_crawled,
+        'timestamp': datetime.now().isoformat(),
+        'scraper_type': 'universal_crawl'
+    }
+    if timings:
+        result['timings'] = timings
+    return result
+
 # Fungsi save_scraped_data untuk kompatibilitas dengan app.py yang lama
 def save_scraped_data(data):
     """Save scraped data to history - for backward compatibility"""
     from dashboard_component import add_to_history
     return add_to_history(data)
+
+def _scrape_allowed(scrape_func, url):
+    # robots.txt is fetched once per site and cached, so this is a dict lookup for later URLs
+    try:
+        if not robots_allowed(url):
+            return {'error': 'Skipped: disallowed by robots.txt'}
+    except RobotsUnreachable as e:
+        return {'error': f'Skipped: {str(e)}'}
+    return scrape_func(url)
+
+def scrape_universal_batch(urls, max_workers=8, crawl=False):
+    """
+    Scrape many websites concurrently and yield each result as soon as it is done.
+
+    Results come back in completion order, not input order, so a slow site never
+    holds back the rest of the batch. Failures are reported per URL as a result
+    dict with an 'error' key; they never abort the batch. With `crawl=True` each
+    website is crawled with crawl_universal_contact instead of only its landing page.
+
+    Every request is paced per host by the scheduler (including any robots.txt
+    Crawl-delay); URLs for a host that is already at its connection cap are
+    held back while other hosts are served. URLs robots.txt disallows are
+    reported as errors without being fetched.
+    """
+    scrape_func = crawl_universal_contact if crawl else scrape_universal_contact
+    max_workers = max(1, int(max_workers))
+    url_iter = (u.strip() for u in urls if u and u.strip())
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = {}
+        in_flight = Counter()
+        # URLs held back because their host already has max_connections_per_host jobs running
+        parked = deque()
+        per_host = get_scheduler().max_connections_per_host
+        max_parked = max_workers * 8
+
+        def take_next():
+            # A worker given a URL for a busy host would only sleep in the scheduler,
+            # so prefer URLs of other hosts and keep total throughput up
+            for index, parked_url in enumerate(parked):
+                if in_flight[host_key(parked_url)] < per_host:
+                    del parked[index]
+                    return parked_url
+            for next_url in url_iter:
+                if in_flight[host_key(next_url)] < per_host or len(parked) >= max_parked:
+                    return next_url
+                parked.append(next_url)
+            return parked.popleft() if parked else None
+
+        # Only keep a bounded number of URLs in flight so that a huge iterable
+        # (e.g. a nightly lead list) is never materialized all at once
+        def submit_next():
+            next_url = take_next()
+            if next_url is None:
+                return False
+            in_flight[host_key(next_url)] += 1
+            pending[executor.submit(_scrape_allowed, scrape_func, next_url)] = next_url
+            return True
+
+        for _ in range(max_workers * 2):
+            if not submit_next():
+                break
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                url = pending.pop(future)
+                in_flight[host_key(url)] -= 1
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = {'error': f'Failed to scrape website: {str(e)}'}
+                result.setdefault('url', url)
+                yield result
+                submit_next()